@@ -0,0 +1,210 @@
+"""
+Typed, columnar loading of the maize (KAP) and chicken/lentils (Agroknow) modelling datasets.
+
+The first call converts a dataset once to Parquet with compact dtypes (float32 numerics,
+categoricals for the text columns); later calls read only the requested columns and row groups:
+
+    from data_loader import load_dataset
+    Xy = load_dataset("chicken", columns=["exceeding_loq", "hazard", "year"], filters=[("year", "<", 2021)])
+
+When no converted copy exists (or pyarrow is not installed) the CSV is streamed in chunks straight
+from the zip, applying the same projection and filters chunk by chunk.
+"""
+import os
+import io
+import time
+import json
+import zipfile
+import argparse
+import operator
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (needed by pandas for Parquet)
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TARGET = "exceeding_loq"
+
+AGROKNOW_CATEGORICAL = ["hazard", "origin_code3", "notified_code3", "continent"]
+DATASETS = {
+    "maize": {
+        "source": "maize for modelling.csv",
+        "categorical": [
+            "method", "ingredient", "stg_name_engels", "ssg_name_engels", "sto_name_engels", "country",
+            "flow", "code3_x", "feedmaterial_name", "supplementary_unit", "code2", "code3_y", "continent",
+        ],
+    },
+    "chicken": {
+        "source": "Agroknow_chicken_data_with_indices_pesticides.zip",
+        "categorical": AGROKNOW_CATEGORICAL,
+    },
+    "lentils": {
+        "source": "Agroknow_lentils_data_with_indices_pesticides.zip",
+        "categorical": AGROKNOW_CATEGORICAL,
+    },
+}
+INTEGER_COLUMNS = {TARGET: "int8", "year": "int16"}
+
+OPERATORS = {
+    "==": operator.eq, "=": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+    "in": lambda s, v: s.isin(v), "not in": lambda s, v: ~s.isin(v),
+}
+
+
+def _dataset(name):
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise ValueError(f"Unknown dataset: {name} (expected one of {sorted(DATASETS)})")
+
+
+def source_path(name, data_dir=HERE):
+    return os.path.join(data_dir, _dataset(name)["source"])
+
+
+def parquet_path(name, data_dir=HERE):
+    return os.path.join(data_dir, f"{name}.parquet")
+
+
+def _open_csv(name, data_dir=HERE):
+    path = source_path(name, data_dir)
+    if path.endswith(".zip"):
+        archive = zipfile.ZipFile(path)
+        member = next(n for n in archive.namelist() if n.endswith(".csv"))
+        return io.TextIOWrapper(archive.open(member), encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def read_header(name, data_dir=HERE):
+    with _open_csv(name, data_dir) as f:
+        return pd.read_csv(f, nrows=0).columns.tolist()
+
+
+def _dtypes(name, columns):
+    """Read dtypes: text columns as str (categorised after filtering), everything else float32."""
+    categorical = set(_dataset(name)["categorical"])
+    return {c: (str if c in categorical else "float32") for c in columns}
+
+
+def _finalize(df, name):
+    categorical = set(_dataset(name)["categorical"])
+    for column in df.columns:
+        if column in categorical:
+            df[column] = df[column].astype("category")
+        elif column in INTEGER_COLUMNS and not df[column].isna().any():
+            df[column] = df[column].astype(INTEGER_COLUMNS[column])
+    return df
+
+
+def _apply_filters(df, filters):
+    if not filters:
+        return df
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in filters:
+        mask &= OPERATORS[op](df[column], value).to_numpy()
+    return df[mask]
+
+
+# -----------------------------
+# Loading
+# -----------------------------
+def stream_csv(name, columns=None, filters=None, chunksize=50000, data_dir=HERE):
+    """Read the original CSV (from the zip if needed) in chunks, keeping only the requested columns and rows."""
+    header = read_header(name, data_dir)
+    filter_columns = [c for c, _, _ in filters or []]
+    wanted = header if columns is None else [c for c in header if c in set(columns) | set(filter_columns)]
+
+    chunks = []
+    with _open_csv(name, data_dir) as f:
+        for chunk in pd.read_csv(f, usecols=wanted, dtype=_dtypes(name, wanted), chunksize=chunksize):
+            chunks.append(_apply_filters(chunk, filters))
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=wanted)
+    if columns is not None:
+        df = df[list(columns)]
+    return _finalize(df, name)
+
+
+def convert_to_parquet(name, data_dir=HERE, row_group_size=50000):
+    """One-off conversion of a dataset to a typed Parquet file next to the original."""
+    if not HAS_PARQUET:
+        raise ImportError("pyarrow is required to convert datasets to Parquet")
+    # rows keep the original file order so that seeded train/test splits match the notebooks
+    df = stream_csv(name, data_dir=data_dir)
+    path = parquet_path(name, data_dir)
+    df.to_parquet(path, engine="pyarrow", index=False, row_group_size=row_group_size)
+    return path
+
+
+def load_dataset(name, columns=None, filters=None, convert=True, data_dir=HERE):
+    """
+    Load a modelling dataset with compact dtypes.
+
+    columns: list of columns to keep (in this order); None keeps all columns in file order.
+    filters: list of (column, op, value) tuples combined with AND, e.g. [("year", "<", 2021)].
+    convert: create the Parquet copy on first use when pyarrow is available.
+    """
+    path = parquet_path(name, data_dir)
+    if HAS_PARQUET and not os.path.exists(path) and convert:
+        convert_to_parquet(name, data_dir)
+    if HAS_PARQUET and os.path.exists(path):
+        df = pd.read_parquet(path, columns=list(columns) if columns is not None else None,
+                             filters=[tuple(f) for f in filters] if filters else None)
+        return _finalize(df, name)
+    return stream_csv(name, columns=columns, filters=filters, data_dir=data_dir)
+
+
+# -----------------------------
+# Comparison against pd.read_csv
+# -----------------------------
+def _measure(fn):
+    tracemalloc.start()
+    start_time = time.time()
+    df = fn()
+    elapsed_time = time.time() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(elapsed_time, 2),
+        "peak_memory_mb": round(peak / 2**20, 1),
+        "frame_memory_mb": round(df.memory_usage(deep=True).sum() / 2**20, 1),
+        "shape": list(df.shape),
+    }
+
+
+def compare_loaders(name, columns=None, filters=None, data_dir=HERE):
+    """Load time and memory of the notebook path (plain read_csv, then select) vs. the typed loaders."""
+    def read_csv():
+        df = pd.read_csv(source_path(name, data_dir))
+        df = _apply_filters(df, filters)
+        return df[list(columns)] if columns is not None else df
+
+    report = {"dataset": name, "read_csv": _measure(read_csv)}
+    report["stream_csv"] = _measure(lambda: stream_csv(name, columns=columns, filters=filters, data_dir=data_dir))
+    if HAS_PARQUET:
+        if not os.path.exists(parquet_path(name, data_dir)):
+            convert_to_parquet(name, data_dir)
+        report["parquet"] = _measure(
+            lambda: load_dataset(name, columns=columns, filters=filters, data_dir=data_dir)
+        )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the modelling datasets to Parquet and compare load paths.")
+    parser.add_argument("datasets", nargs="*", default=sorted(DATASETS))
+    parser.add_argument("--output", default="loader_comparison.json")
+    args = parser.parse_args()
+
+    reports = []
+    for name in args.datasets:
+        reports.append(compare_loaders(name, filters=[("year", "<", 2021)]))
+        print(json.dumps(reports[-1], indent=2))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(reports, f, indent=2)
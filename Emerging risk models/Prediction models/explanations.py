@@ -0,0 +1,230 @@
+"""
+Per-prediction explanations for the tree models of the scoring service.
+
+Exact tree attributions (TreeSHAP) come from the boosters themselves, for a whole batch at once:
+XGBoost pred_contribs, LightGBM pred_contrib and CatBoost ShapValues. Per row, attributions plus
+the base value add up to the model's log-odds. Rows are explained in chunks, so time and memory
+grow with the chunk size, not with the dataset:
+
+    python explanations.py chicken                  # explain the full dataset with models/chicken.joblib
+
+Two compact tables are written next to the scores:
+  <dataset>_explanations.csv  one row per record: predict, probability and the top-k features
+                              (name, value and contribution) that drove the score
+  <dataset>_explanation_groups.csv  mean contribution and mean |contribution| per feature, per
+                              country / hazard / month (e.g. why consignments from one origin are flagged)
+"""
+import os
+import re
+import time
+import json
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from data_loader import load_dataset
+from scoring_service import MODEL_DIR, RiskScorer
+
+# Columns the explanations are summarised by, per supply chain
+GROUP_COLUMNS = {
+    "maize": ["country", "sto_name_engels", "year"],
+    "chicken": ["origin_code3", "hazard", "month"],
+    "lentils": ["origin_code3", "hazard", "month"],
+}
+
+
+def original_features(encoded_names, features):
+    """
+    Map encoded column names back to the original features. Native categoricals keep one column
+    per feature; one-hot outputs of the notebooks' ColumnTransformer ("cat__hazard_<value>",
+    "remainder__month") are mapped to the feature they were expanded from.
+    """
+    known = set(features)
+    mapping = []
+    for name in encoded_names:
+        if name in known:
+            mapping.append(name)
+            continue
+        stripped = re.sub(r"^(cat__|remainder__)", "", name)
+        # longest feature name that prefixes the encoded column
+        candidates = [f for f in known if stripped == f or stripped.startswith(f + "_")]
+        mapping.append(max(candidates, key=len) if candidates else stripped)
+    return mapping
+
+
+def aggregate_contributions(contribs, encoded_names, features):
+    """Sum the contributions of encoded columns per original feature (n_rows x n_features)."""
+    mapping = original_features(encoded_names, features)
+    if mapping == list(features):
+        return contribs
+    positions = {feature: i for i, feature in enumerate(features)}
+    columns = np.array([positions.get(feature, -1) for feature in mapping])
+    out = np.zeros((contribs.shape[0], len(features)), dtype=contribs.dtype)
+    for j in np.unique(columns[columns >= 0]):
+        out[:, j] = contribs[:, columns == j].sum(axis=1)
+    return out
+
+
+# -----------------------------
+# Attributions
+# -----------------------------
+def tree_contributions(scorer, X):
+    """Exact per-row attributions for an encoded batch: (contributions n x features, base values n)."""
+    if scorer.model_name == "XGBoost":
+        import xgboost
+        booster = scorer.model.get_booster()
+        contribs = booster.predict(xgboost.DMatrix(X, enable_categorical=True), pred_contribs=True)
+        names = booster.feature_names or list(X.columns)
+    elif scorer.model_name == "LightGBM":
+        contribs = scorer.model.booster_.predict(X, pred_contrib=True)
+        names = scorer.model.booster_.feature_name()
+    elif scorer.model_name == "CatBoost":
+        from catboost import Pool
+        pool = Pool(X, cat_features=scorer.encoder.categorical_columns)
+        contribs = scorer.model.get_feature_importance(pool, type="ShapValues")
+        names = list(X.columns)
+    else:
+        raise ValueError(
+            f"Tree attributions are available for XGBoost, LightGBM and CatBoost, not {scorer.model_name}"
+        )
+    contribs = np.asarray(contribs, dtype=np.float32)
+    return aggregate_contributions(contribs[:, :-1], names, scorer.features), contribs[:, -1]
+
+
+def scores_from_contributions(contribs, base, index):
+    """
+    predict/probability as in RiskScorer.score_frame, from the attributions alone: contributions
+    plus base value are the log-odds, and the classifiers predict class 1 above probability 0.5.
+    """
+    log_odds = contribs.sum(axis=1, dtype=np.float64) + base
+    probability = 1.0 / (1.0 + np.exp(-log_odds))
+    return pd.DataFrame({
+        "predict": (probability > 0.5).astype("int8"),
+        "probability": probability.astype("float32"),
+    }, index=index)
+
+
+def top_features(contribs, X_raw, features, k=3):
+    """Top-k features by absolute contribution per row, as a compact frame."""
+    k = min(k, contribs.shape[1])
+    top = np.argpartition(-np.abs(contribs), k - 1, axis=1)[:, :k]
+    # order the k selected columns by |contribution|
+    order = np.argsort(-np.abs(np.take_along_axis(contribs, top, axis=1)), axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    names = np.asarray(features, dtype=object)
+    raw = X_raw[features].astype(object).to_numpy()
+    rows = np.arange(len(contribs))
+    out = {}
+    for i in range(k):
+        out[f"feature_{i + 1}"] = names[top[:, i]]
+        out[f"value_{i + 1}"] = raw[rows, top[:, i]]
+        out[f"contribution_{i + 1}"] = np.round(contribs[rows, top[:, i]], 4)
+    return pd.DataFrame(out, index=X_raw.index)
+
+
+class GroupSummary:
+    """Streaming per-group sums of contributions, so memory stays at groups x features."""
+
+    def __init__(self, features):
+        self.features = features
+        self.sums = {}
+
+    def update(self, group_column, groups, contribs, flagged):
+        keys = groups.astype("string").fillna("missing").to_numpy()
+        values, inverse = np.unique(keys, return_inverse=True)
+        n_groups = len(values)
+        total = np.zeros((n_groups, contribs.shape[1]))
+        absolute = np.zeros((n_groups, contribs.shape[1]))
+        np.add.at(total, inverse, contribs)
+        np.add.at(absolute, inverse, np.abs(contribs))
+        counts = np.bincount(inverse, minlength=n_groups)
+        flags = np.bincount(inverse, weights=flagged, minlength=n_groups)
+        for i, value in enumerate(values):
+            entry = self.sums.setdefault((group_column, value), [0, 0.0, 0.0, 0.0])
+            entry[0] += counts[i]
+            entry[1] = entry[1] + total[i]
+            entry[2] = entry[2] + absolute[i]
+            entry[3] += flags[i]
+
+    def to_frame(self, top=10):
+        rows = []
+        for (group_column, value), (n, total, absolute, flagged) in self.sums.items():
+            mean, mean_abs = total / n, absolute / n
+            for j in np.argsort(-mean_abs)[:top]:
+                rows.append({
+                    "group_column": group_column, "group": value, "rows": n,
+                    "flagged_share": round(flagged / n, 4), "feature": self.features[j],
+                    "mean_contribution": round(float(mean[j]), 4),
+                    "mean_abs_contribution": round(float(mean_abs[j]), 4),
+                })
+        return pd.DataFrame(rows)
+
+
+# -----------------------------
+# Engine
+# -----------------------------
+def explain(scorer, df, group_columns=(), chunksize=20000, k=3, output=None):
+    """
+    Explain every row of df in chunks. Returns (per-row explanation table, grouped summary).
+    df holds the feature columns and optionally the group columns. With an output path the
+    per-row table is appended to that CSV chunk by chunk instead of being kept (None is returned).
+    """
+    summary = GroupSummary(scorer.features)
+    tables = []
+    for i, start in enumerate(range(0, len(df), chunksize)):
+        chunk = df.iloc[start:start + chunksize]
+        X = scorer.encoder.transform(chunk, scorer.mode)
+        contribs, base = tree_contributions(scorer, X)
+        # the model is run once per chunk: scores follow from the contributions
+        scores = scores_from_contributions(contribs, base, chunk.index)
+        table = pd.concat([scores, top_features(contribs, chunk, scorer.features, k)], axis=1)
+        table.insert(0, "row", chunk.index)
+        table.insert(3, "base_value", np.round(base, 4))
+        if output:
+            table.to_csv(output, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        else:
+            tables.append(table)
+        for column in group_columns:
+            if column in chunk:
+                summary.update(column, chunk[column], contribs, scores["predict"].to_numpy())
+    return (pd.concat(tables) if tables else None), summary.to_frame()
+
+
+def explain_dataset(dataset, model_dir=MODEL_DIR, output_dir=".", chunksize=20000, k=3):
+    scorer = RiskScorer.load(dataset, model_dir)
+    group_columns = GROUP_COLUMNS[dataset]
+    df = load_dataset(dataset, columns=list(dict.fromkeys(scorer.features + group_columns)))
+
+    tracemalloc.start()
+    start_time = time.time()
+    _, groups = explain(scorer, df, group_columns, chunksize, k,
+                        output=os.path.join(output_dir, f"{dataset}_explanations.csv"))
+    elapsed_time = time.time() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    groups.to_csv(os.path.join(output_dir, f"{dataset}_explanation_groups.csv"), index=False)
+    return {
+        "dataset": dataset,
+        "model": scorer.model_name,
+        "rows": len(df),
+        "features": len(scorer.features),
+        "seconds": round(elapsed_time, 2),
+        "rows_per_s": round(len(df) / elapsed_time, 1) if elapsed_time else None,
+        "peak_memory_mb": round(peak / 2**20, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Explain the predictions of the saved supply-chain models.")
+    parser.add_argument("datasets", nargs="*", default=["maize", "chicken", "lentils"])
+    parser.add_argument("--chunksize", type=int, default=20000, help="Rows explained per batch (bounds memory)")
+    parser.add_argument("--top", type=int, default=3, help="Features kept per record")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--output-dir", default=".")
+    args = parser.parse_args()
+
+    for name in args.datasets:
+        print(json.dumps(explain_dataset(name, args.model_dir, args.output_dir, args.chunksize, args.top), indent=2))
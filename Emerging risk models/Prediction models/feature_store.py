@@ -0,0 +1,275 @@
+"""
+Country feature store shared by the maize, chicken and lentils models.
+
+The modelling datasets repeat the same country indices (corruption_index ... innovation_index) and
+120 monthly climate columns on every monitoring row. The indices only depend on (country, year);
+the climate columns of the Agroknow datasets also depend on the month of the record (maize rows
+have no month and one climate profile per country and year). The store keeps one row per
+(country code, year) for the indices and one row per (country code, year, month) for the climate,
+and the monitoring data keeps only the keys:
+
+    from data_loader import load_dataset
+    from feature_store import FeatureStore
+
+    store = FeatureStore.build_from_datasets()          # or FeatureStore.load("country_features.parquet")
+    facts = store.strip(load_dataset("chicken"))
+    X = store.materialize(facts, "chicken", columns=["corruption_index", "temperature_max_sum_7"])
+
+Monthly climate sums are not stored: every "<variable>_sum_<m>" equals "<variable>_mean_<m>" times
+the number of days with observations in month m, which is the same for all climate variables of a
+climate row. The store keeps the means plus one "days_<m>" column and derives sums on request.
+"""
+import re
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATASETS, load_dataset, read_header
+
+INDEX_COLUMNS = [
+    "corruption_index", "human_development_index", "control_corruption", "government_effectiveness",
+    "political_stability", "regulatory_quality", "rule_of_law", "voice_and_accountability",
+    "governance_index", "press_freedom_index", "democracy_index", "polity_democracy_index",
+    "gdp_current", "gdp_growth", "legal_system", "food_security_index", "innovation_index",
+]
+# Climate columns are named "<variable>_<mean|sum>_<month>", e.g. temperature_max_mean_7
+CLIMATE_VARIABLES = [
+    "temperature_max", "temperature_mean", "temperature_min",
+    "precipitation_mean", "relative_humidity_mean",
+]
+MONTHS = range(1, 13)
+CLIMATE_PATTERN = re.compile(r"^(?P<variable>.+)_(?P<stat>mean|sum)_(?P<month>1[0-2]|[1-9])$")
+
+# (country code, year, month) columns of each dataset; month None: one climate row per (country, year)
+KEYS = {
+    "maize": ("code3_y", "year", None),
+    "chicken": ("origin_code3", "year", "month"),
+    "lentils": ("origin_code3", "year", "month"),
+}
+INDEX_KEY = ("country_code3", "year")
+CLIMATE_KEY = ("country_code3", "year", "month")
+NO_MONTH = 0  # climate key month of datasets without a month column
+CONFLICT_POLICIES = ("error", "first")
+
+
+def is_store_column(column):
+    match = CLIMATE_PATTERN.match(column)
+    return column in INDEX_COLUMNS or bool(match and match["variable"] in CLIMATE_VARIABLES)
+
+
+def is_climate_column(column):
+    return column not in INDEX_COLUMNS and is_store_column(column)
+
+
+def strip_columns(columns):
+    """Columns left on the monitoring rows once the store-served features are removed."""
+    return [c for c in columns if not is_store_column(c)]
+
+
+def check_headers(datasets=tuple(DATASETS)):
+    """
+    Make sure strip() removes every monthly climate column (*_mean_<m> / *_sum_<m>) of the real
+    dataset headers, i.e. that CLIMATE_VARIABLES matches the files. Raises ValueError otherwise.
+    """
+    left = {}
+    for name in datasets:
+        unmatched = [c for c in strip_columns(read_header(name)) if CLIMATE_PATTERN.match(c)]
+        if unmatched:
+            left[name] = unmatched
+    if left:
+        raise ValueError(f"Monthly climate columns not recognized by the feature store: {left}")
+
+
+def _normalize_codes(codes):
+    return codes.astype("string").str.upper()
+
+
+def _deduplicate(wide, key, columns, on_conflict):
+    grouped = wide[list(key) + columns].groupby(list(key), sort=True)
+    conflicts = (grouped.nunique(dropna=True) > 1).any(axis=1)
+    if conflicts.any() and on_conflict == "error":
+        raise ValueError(
+            f"{int(conflicts.sum())} {key} keys have differing feature values, e.g. "
+            f"{list(conflicts[conflicts].index[:5])}; pass on_conflict='first' to keep the first row"
+        )
+    return grouped.first()
+
+
+class FeatureStore:
+    def __init__(self, indices, climate, derived_sums=()):
+        # indices: one row per (country_code3, year)
+        # climate: one row per (country_code3, year, month), climate means and days_<m>
+        self.indices = indices.sort_index()
+        self.climate = climate.sort_index()
+        self.derived_sums = set(derived_sums)
+
+    # -----------------------------
+    # Building
+    # -----------------------------
+    @classmethod
+    def build(cls, frames, tolerance=1e-3, on_conflict="error"):
+        """
+        Build the store from wide dataset frames, given as {dataset name: DataFrame}.
+        on_conflict: "error" raises when one key has differing feature values (across rows or
+        datasets); "first" keeps the values of the first row seen for the key.
+        Sums are dropped for every climate variable where sum == mean * days holds within tolerance.
+        """
+        if on_conflict not in CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy: {on_conflict} (expected one of {CONFLICT_POLICIES})")
+        parts = []
+        for name, df in frames.items():
+            country, year, month = KEYS[name]
+            columns = [c for c in df.columns if is_store_column(c)]
+            part = df[[country, year] + ([month] if month else []) + columns].dropna(subset=[country, year])
+            renames = {country: CLIMATE_KEY[0], year: CLIMATE_KEY[1]}
+            if month:
+                renames[month] = CLIMATE_KEY[2]
+            part = part.rename(columns=renames)
+            part[CLIMATE_KEY[0]] = _normalize_codes(part[CLIMATE_KEY[0]])
+            part[CLIMATE_KEY[1]] = part[CLIMATE_KEY[1]].astype("int16")
+            if not month:
+                part[CLIMATE_KEY[2]] = NO_MONTH
+            part[CLIMATE_KEY[2]] = part[CLIMATE_KEY[2]].astype("Int8")
+            parts.append(part)
+        wide = pd.concat(parts, ignore_index=True, sort=False)
+
+        index_columns = [c for c in INDEX_COLUMNS if c in wide]
+        indices = _deduplicate(wide, INDEX_KEY, index_columns, on_conflict).astype("float32")
+
+        # rows without a month carry no climate values
+        climate_columns = [c for c in wide.columns if is_climate_column(c)]
+        climate_rows = wide.dropna(subset=[CLIMATE_KEY[2]])
+        climate = _deduplicate(climate_rows, CLIMATE_KEY, climate_columns, on_conflict)
+
+        # one day count per month, shared by all climate variables
+        derived = []
+        for month in MONTHS:
+            ratios = []
+            for variable in CLIMATE_VARIABLES:
+                mean, total = f"{variable}_mean_{month}", f"{variable}_sum_{month}"
+                if mean in climate and total in climate:
+                    with np.errstate(divide="ignore", invalid="ignore"):
+                        ratios.append((climate[total] / climate[mean]).where(climate[mean].abs() > 1e-9))
+            if not ratios:
+                continue
+            days = pd.concat(ratios, axis=1).median(axis=1).round()
+            climate[f"days_{month}"] = days.astype("float32")
+            for variable in CLIMATE_VARIABLES:
+                mean, total = f"{variable}_mean_{month}", f"{variable}_sum_{month}"
+                if mean not in climate or total not in climate:
+                    continue
+                error = (climate[mean] * days - climate[total]).abs() / climate[total].abs().clip(lower=1.0)
+                # every present sum has to be reproducible, otherwise the sum column is kept
+                if not (climate[total].notna() & ~(error <= tolerance)).any():
+                    derived.append(total)
+        climate = climate.drop(columns=derived).astype("float32")
+        return cls(indices, climate, derived)
+
+    @classmethod
+    def build_from_datasets(cls, datasets=tuple(DATASETS), on_conflict="error"):
+        check_headers(datasets)
+        frames = {}
+        for name in datasets:
+            keys = [c for c in KEYS[name] if c]
+            columns = keys + [c for c in read_header(name) if is_store_column(c)]
+            frames[name] = load_dataset(name, columns=columns)
+        return cls.build(frames, on_conflict=on_conflict)
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, path="country_features.parquet"):
+        """Indices go to <path>, climate rows to <path with _climate suffix>."""
+        self.indices.reset_index().to_parquet(path, index=False)
+        self.climate.reset_index().to_parquet(_climate_path(path), index=False)
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump({"derived_sums": sorted(self.derived_sums)}, f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path="country_features.parquet"):
+        indices = pd.read_parquet(path).set_index(list(INDEX_KEY))
+        climate = pd.read_parquet(_climate_path(path)).set_index(list(CLIMATE_KEY))
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            derived_sums = json.load(f)["derived_sums"]
+        return cls(indices, climate, derived_sums)
+
+    # -----------------------------
+    # Serving
+    # -----------------------------
+    @property
+    def columns(self):
+        """Every feature the store can serve, stored or derived."""
+        return (list(self.indices.columns) + [c for c in self.climate.columns if not c.startswith("days_")]
+                + sorted(self.derived_sums))
+
+    def strip(self, df):
+        """Drop the store-served columns from wide monitoring rows, keeping the key columns."""
+        return df[strip_columns(df.columns)]
+
+    def _row_positions(self, facts, dataset):
+        country, year, month = KEYS[dataset]
+        codes = _normalize_codes(facts[country])
+        years = pd.to_numeric(facts[year], errors="coerce").astype("Int16")
+        months = (pd.to_numeric(facts[month], errors="coerce") if month
+                  else pd.Series(NO_MONTH, index=facts.index)).astype("Int8")
+        index_rows = self.indices.index.get_indexer(pd.MultiIndex.from_arrays([codes, years]))
+        climate_rows = self.climate.index.get_indexer(pd.MultiIndex.from_arrays([codes, years, months]))
+        return index_rows, climate_rows
+
+    def materialize(self, facts, dataset, columns=None):
+        """
+        Vectorized join of store features onto monitoring rows: only the requested columns are built.
+        Returns a float32 frame aligned with facts (NaN where a key is missing from the store).
+        """
+        columns = self.columns if columns is None else list(columns)
+        index_rows, climate_rows = self._row_positions(facts, dataset)
+
+        def lookup(table, positions, column):
+            missing = positions < 0
+            values = table[column].to_numpy()[np.where(missing, 0, positions)]
+            values[missing] = np.nan
+            return values
+
+        out = {}
+        for column in columns:
+            if column in self.indices:
+                out[column] = lookup(self.indices, index_rows, column)
+            elif column in self.derived_sums:
+                match = CLIMATE_PATTERN.match(column)
+                mean = f"{match['variable']}_mean_{match['month']}"
+                out[column] = (lookup(self.climate, climate_rows, mean)
+                               * lookup(self.climate, climate_rows, f"days_{match['month']}"))
+            else:
+                out[column] = lookup(self.climate, climate_rows, column)
+        return pd.DataFrame(out, index=facts.index, dtype="float32")
+
+    def join(self, facts, dataset, columns=None):
+        """Monitoring rows with the requested store features appended (the wide matrix, on demand)."""
+        return pd.concat([facts, self.materialize(facts, dataset, columns)], axis=1)
+
+
+def _climate_path(path):
+    root, ext = path.rsplit(".", 1) if "." in path else (path, "parquet")
+    return f"{root}_climate.{ext}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the shared country feature store.")
+    parser.add_argument("--output", default="country_features.parquet")
+    parser.add_argument("--on-conflict", choices=CONFLICT_POLICIES, default="error",
+                        help="Fail on keys with differing feature values, or keep the first row")
+    args = parser.parse_args()
+
+    store = FeatureStore.build_from_datasets(on_conflict=args.on_conflict)
+    store.save(args.output)
+    store_mb = (store.indices.memory_usage(deep=True).sum() + store.climate.memory_usage(deep=True).sum()) / 2**20
+    print(f"Feature store: {len(store.indices)} (country, year) rows, {len(store.climate)} climate rows, "
+          f"{len(store.derived_sums)} derived sum columns dropped")
+    for name in DATASETS:
+        wide = load_dataset(name)
+        facts = store.strip(wide)
+        print(f"{name}: wide {wide.memory_usage(deep=True).sum() / 2**20:.1f} MB -> "
+              f"facts {facts.memory_usage(deep=True).sum() / 2**20:.1f} MB + shared store {store_mb:.1f} MB")
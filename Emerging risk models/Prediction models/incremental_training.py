@@ -0,0 +1,211 @@
+"""
+Warm-start retraining of the XGBoost/LightGBM supply-chain models when new monitoring data arrives.
+
+Instead of re-encoding and refitting the full history, boosting continues from the saved model
+(models/<dataset>.joblib, see scoring_service.py) on the new rows only, or on a rolling window of
+recent years. The saved encoder is reused, so the category vocabulary stays fixed; when the new
+rows contain categories the encoder has never seen (a new origin country, hazard, ...), a full
+refit is required and is done instead.
+
+    python incremental_training.py update lentils --since 2020            # new rows only
+    python incremental_training.py update lentils --since 2020 --window 3 # rolling 3-year window
+    python incremental_training.py compare lentils                        # incremental vs. full refit
+"""
+import time
+import json
+import argparse
+
+from data_loader import TARGET, load_dataset
+from training_pipeline import (
+    INPUT_MODES, TRAIN_FILTER, TRAIN_UNTIL, CategoricalEncoder, evaluate, feature_columns, fit_model, make_model,
+    sample_weights, split,
+)
+from scoring_service import MODEL_DIR, bundle_path, save_bundle
+
+WARM_START_MODELS = ("XGBoost", "LightGBM")
+
+
+def vocabulary_changes(encoder, X):
+    """Category values in X that the encoder has not seen, per column."""
+    changes = {}
+    for column, categories in encoder.categories_.items():
+        values = set(X[column].dropna().astype(str).unique())
+        unseen = sorted(values.difference(categories))
+        if unseen:
+            changes[column] = unseen
+    return changes
+
+
+def new_rows_mask(df, since_year, since_month=None):
+    """Rows at or after (since_year, since_month)."""
+    year = df["year"].to_numpy()
+    if since_month is None or "month" not in df:
+        return year >= since_year
+    month = df["month"].to_numpy()
+    return (year > since_year) | ((year == since_year) & (month >= since_month))
+
+
+def continue_training(model, model_name, dataset, X, y, rounds=50):
+    """Add `rounds` boosting rounds to a fitted model using only the given rows."""
+    if model_name not in WARM_START_MODELS:
+        raise ValueError(f"Warm start is only supported for {WARM_START_MODELS}, not {model_name}")
+    params = {k: v for k, v in model.get_params().items() if k != "n_estimators"}
+    incremental = type(model)(**params, n_estimators=rounds)
+    weights = sample_weights(y, dataset)
+    if model_name == "XGBoost":
+        return incremental.fit(X, y, sample_weight=weights, xgb_model=model.get_booster())
+    return incremental.fit(X, y, sample_weight=weights, init_model=model.booster_)
+
+
+def _full_refit(dataset, model_name, X, y, **params):
+    encoder = CategoricalEncoder().fit(X)
+    model = make_model(model_name, dataset, encoder, **params)
+    fit_model(model, encoder.transform(X, INPUT_MODES[model_name]), y, sample_weights(y, dataset))
+    return model, encoder
+
+
+# -----------------------------
+# Production update
+# -----------------------------
+def update_model(dataset, since_year, since_month=None, until_year=TRAIN_UNTIL, window_years=None,
+                 rounds=50, model_dir=MODEL_DIR):
+    """
+    Update the saved model of a supply chain with the rows from (since_year, since_month) on.
+    window_years: continue on the last N years (ending with the new data) instead of the new rows only.
+    until_year: exclusive upper year bound for the new rows and for a full refit; defaults to the
+    notebooks' year < 2021 training split, so raise it when data from 2021 on arrives.
+    The saved bundle records the strategy, rows and year range; its test metrics are cleared, since
+    the updated model was trained without the notebook holdout (see compare() for scores).
+    """
+    import joblib
+
+    if until_year is not None and since_year >= until_year:
+        raise ValueError(f"No rows between --since {since_year} and --until {until_year} (exclusive); "
+                         "raise --until to include the new data")
+
+    bundle = joblib.load(bundle_path(dataset, model_dir))
+    model_name, encoder = bundle["model_name"], bundle["encoder"]
+    columns = feature_columns(dataset)
+    first_year = since_year - window_years + 1 if window_years else since_year
+    filters = [("year", ">=", first_year)] + ([("year", "<", until_year)] if until_year else [])
+    df = load_dataset(dataset, columns=list(dict.fromkeys(columns + ["year", TARGET])), filters=filters)
+    if not window_years:
+        df = df[new_rows_mask(df, since_year, since_month)]
+    if df.empty:
+        month = f"-{since_month:02d}" if since_month and not window_years else ""
+        until = f" before {until_year}" if until_year else ""
+        raise ValueError(f"No {dataset} rows from {first_year}{month}{until}; nothing to update")
+    X, y = df[columns], df[TARGET].astype("int8")
+
+    start_time = time.time()
+    changes = vocabulary_changes(encoder, X)
+    if changes or model_name not in WARM_START_MODELS:
+        # new categories (or a model without warm start): refit on the full history
+        history_filters = [("year", "<", until_year)] if until_year else None
+        full = load_dataset(dataset, columns=list(dict.fromkeys(columns + [TARGET])), filters=history_filters)
+        model, encoder = _full_refit(dataset, model_name, full[columns], full[TARGET].astype("int8"))
+        training = {"strategy": "full_refit", "rows": len(full), "since": None, "since_month": None}
+    else:
+        model = continue_training(bundle["model"], model_name, dataset, encoder.transform(X, "native"), y, rounds)
+        training = {"strategy": "incremental", "rows": len(X), "since": first_year,
+                    "since_month": None if window_years else since_month}
+    training["until"] = until_year
+    elapsed_time = time.time() - start_time
+
+    save_bundle(dataset, model, encoder, bundle["mode"], model_name, None, model_dir, training)
+    return {"dataset": dataset, **training, "seconds": round(elapsed_time, 3), "vocabulary_changes": changes}
+
+
+# -----------------------------
+# Incremental vs. full refit
+# -----------------------------
+def compare(dataset, model_name="XGBoost", new_year=None, window_years=None, rounds=50, **params):
+    """
+    Replay the arrival of the last year of data: a base model is fitted on the earlier years, then
+    either continued on the new year's rows (or a rolling window) or refitted on all rows. All models
+    are scored on the notebooks' 20% test rows, overall and for the new year alone.
+    """
+    columns = feature_columns(dataset)
+    df = load_dataset(dataset, columns=list(dict.fromkeys(columns + ["year", TARGET])), filters=TRAIN_FILTER)
+    new_year = new_year or int(df["year"].max())
+    train_df, test_df = split(df, df[TARGET])[:2]
+    y_test = test_df[TARGET].astype("int8")
+    old_train = train_df[train_df["year"] < new_year]
+    if window_years:
+        increment = train_df[train_df["year"] > new_year - window_years]
+    else:
+        increment = train_df[train_df["year"] == new_year]
+
+    report = {"dataset": dataset, "model": model_name, "new_year": new_year,
+              "history_rows": len(old_train), "new_rows": int((train_df["year"] == new_year).sum())}
+
+    start_time = time.time()
+    base, encoder = _full_refit(dataset, model_name, old_train[columns], old_train[TARGET].astype("int8"), **params)
+    base_seconds = time.time() - start_time
+    changes = vocabulary_changes(encoder, increment[columns])
+
+    start_time = time.time()
+    incremental = continue_training(base, model_name, dataset, encoder.transform(increment[columns], "native"),
+                                    increment[TARGET].astype("int8"), rounds)
+    incremental_seconds = time.time() - start_time
+
+    start_time = time.time()
+    full, full_encoder = _full_refit(dataset, model_name, train_df[columns], train_df[TARGET].astype("int8"), **params)
+    full_seconds = time.time() - start_time
+
+    new_test = (test_df["year"] == new_year).to_numpy()
+
+    def scores(model, model_encoder):
+        X_test = model_encoder.transform(test_df[columns], "native")
+        y_pred, y_score = model.predict(X_test), model.predict_proba(X_test)[:, 1]
+        return {
+            "all_test_rows": evaluate(y_test, y_pred, y_score),
+            "new_year_test_rows": evaluate(y_test[new_test], y_pred[new_test], y_score[new_test])
+            if new_test.any() else {},
+        }
+
+    # the incremental model keeps the base vocabulary: unseen categories are treated as missing,
+    # which update_model() would not accept (it refits instead)
+    report["vocabulary_changes"] = changes
+    report["full_refit_required"] = bool(changes)
+    report["base"] = {"seconds": round(base_seconds, 3), **scores(base, encoder)}
+    report["incremental"] = {"seconds": round(incremental_seconds, 3), "rows": len(increment),
+                             **scores(incremental, encoder)}
+    report["full_refit"] = {"seconds": round(full_seconds, 3), "rows": len(train_df),
+                            **scores(full, full_encoder)}
+    report["speedup"] = round(full_seconds / incremental_seconds, 1) if incremental_seconds else None
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm-start retraining of the supply-chain models.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    update_parser = subparsers.add_parser("update", help="Continue the saved model on newly arrived rows")
+    update_parser.add_argument("dataset")
+    update_parser.add_argument("--since", type=int, required=True, help="First year of the new data")
+    update_parser.add_argument("--since-month", type=int, choices=range(1, 13), default=None, metavar="1-12")
+    update_parser.add_argument("--until", type=int, default=TRAIN_UNTIL,
+                               help=f"Exclusive upper year bound (default: the notebooks' split, {TRAIN_UNTIL})")
+    update_parser.add_argument("--window", type=int, default=None, help="Continue on a rolling window of N years")
+    update_parser.add_argument("--rounds", type=int, default=50, help="Boosting rounds to add")
+
+    compare_parser = subparsers.add_parser("compare", help="Incremental vs. full refit on the last year")
+    compare_parser.add_argument("datasets", nargs="*", default=["maize", "chicken", "lentils"])
+    compare_parser.add_argument("--model", choices=WARM_START_MODELS, default="XGBoost")
+    compare_parser.add_argument("--window", type=int, default=None)
+    compare_parser.add_argument("--rounds", type=int, default=50)
+    compare_parser.add_argument("--output", default="incremental_comparison.json")
+    args = parser.parse_args()
+
+    if args.command == "update":
+        try:
+            report = update_model(args.dataset, args.since, args.since_month, args.until, args.window, args.rounds)
+        except ValueError as error:
+            parser.error(str(error))
+        print(json.dumps(report, indent=2))
+    else:
+        reports = [compare(name, args.model, window_years=args.window, rounds=args.rounds) for name in args.datasets]
+        print(json.dumps(reports, indent=2, default=float))
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2, default=float)
@@ -0,0 +1,274 @@
+"""
+Parallel model comparison and hyperparameter search for the pesticide residue models.
+
+All candidate models of the notebooks (XGBoost, CatBoost, Random Forest, SVM, Logistic Regression,
+LightGBM) are searched with successive halving: every candidate is cross-validated on a fraction
+of the training rows, the best 1/eta continue on eta times more rows, until the last rung uses all
+rows. Folds are either stratified random folds or out-of-time folds (train on earlier years,
+validate on one later year). The data is encoded once per input mode and cached on disk; worker
+processes load the cached matrices instead of re-encoding per fold.
+
+    python model_search.py chicken --cv year --workers 4
+
+The best configuration of each model is refit on the notebooks' 80/20 split and the test metrics
+are written to model_comparison_<dataset>.csv, with the test predictions of each model in
+results_test_<dataset>_<model>.csv (the layout of results_test_maize.csv).
+"""
+import os
+import time
+import json
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+
+from data_loader import TARGET, load_dataset
+from training_pipeline import (
+    INPUT_MODES, TRAIN_FILTER, CategoricalEncoder, evaluate, feature_columns, fit_model, make_model,
+    results_frame, sample_weights, split,
+)
+
+# Search spaces; the notebook configuration ({}) is always the first candidate
+SEARCH_SPACES = {
+    "XGBoost": {
+        "max_depth": [3, 5, 7, 9], "learning_rate": [0.03, 0.1, 0.3], "n_estimators": [100, 200, 400],
+        "subsample": [0.8, 1.0], "colsample_bytree": [0.6, 0.8, 1.0],
+    },
+    "LightGBM": {
+        "num_leaves": [15, 31, 63], "learning_rate": [0.03, 0.1, 0.3], "n_estimators": [100, 200, 400],
+        "subsample": [0.8, 1.0], "subsample_freq": [1], "colsample_bytree": [0.6, 0.8, 1.0],
+    },
+    "CatBoost": {
+        "depth": [4, 6, 8], "learning_rate": [0.03, 0.1, 0.3], "iterations": [200, 500],
+    },
+    "Random Forest": {
+        "n_estimators": [100, 300], "max_depth": [None, 10, 20], "min_samples_leaf": [1, 3, 5],
+    },
+    "SVM": {
+        "C": [0.1, 1, 10], "gamma": ["scale", 0.01],
+    },
+    "Logistic Regression": {
+        "C": [0.01, 0.1, 1, 10],
+    },
+}
+# Parameter name for the per-process thread count of each model
+THREAD_PARAMS = {"XGBoost": "n_jobs", "LightGBM": "n_jobs", "CatBoost": "thread_count", "Random Forest": "n_jobs"}
+
+
+# -----------------------------
+# Cross-validation folds
+# -----------------------------
+def random_folds(y, n_splits=5, random_state=42):
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    return list(cv.split(np.zeros(len(y)), y))
+
+
+def year_folds(years, n_splits=3):
+    """Out-of-time folds: for each of the last n_splits years, train on all earlier years."""
+    years = np.asarray(years)
+    folds = []
+    for year in np.unique(years)[-n_splits:]:
+        train_idx, val_idx = np.flatnonzero(years < year), np.flatnonzero(years == year)
+        if len(train_idx) and len(val_idx):
+            folds.append((train_idx, val_idx))
+    return folds
+
+
+# -----------------------------
+# Shared cache
+# -----------------------------
+def build_cache(dataset, cv="random", n_splits=5, models=tuple(INPUT_MODES), cache_dir="model_search_cache"):
+    """Split, fit the encoder once and store the encoded training/test matrices for every input mode."""
+    columns = feature_columns(dataset)
+    df = load_dataset(dataset, columns=list(dict.fromkeys(columns + ["year", TARGET])), filters=TRAIN_FILTER)
+    X, y = df[columns], df[TARGET].astype("int8")
+    X_train_raw, X_test_raw, y_train, y_test = split(X, y)
+
+    encoder = CategoricalEncoder().fit(X_train_raw)
+    modes = sorted({INPUT_MODES[name] for name in models})
+    folds = (year_folds(df.loc[X_train_raw.index, "year"], n_splits) if cv == "year"
+             else random_folds(y_train, n_splits))
+    cache = {
+        "dataset": dataset,
+        "encoder": encoder,
+        "train": {mode: encoder.transform(X_train_raw, mode) for mode in modes},
+        "test": {mode: encoder.transform(X_test_raw, mode) for mode in modes},
+        "y_train": y_train.to_numpy(),
+        "y_test": y_test,
+        "X_test_raw": X_test_raw,
+        "folds": folds,
+    }
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{dataset}_{cv}.joblib")
+    joblib.dump(cache, path)
+    logging.info(f"Cached {dataset}: {len(y_train)} training rows, {len(folds)} {cv} folds, modes {modes}")
+    return path
+
+
+_cache = None
+
+
+def _init_worker(cache_path):
+    global _cache
+    _cache = joblib.load(cache_path)
+
+
+def _subsample(train_idx, fraction, seed=42):
+    if fraction >= 1:
+        return train_idx
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.permutation(train_idx)[:max(int(len(train_idx) * fraction), 1)])
+
+
+def _evaluate_candidate(task):
+    """Cross-validate one (model, params) candidate on a fraction of each fold's training rows."""
+    name, params, fraction, threads = task
+    X, y = _cache["train"][INPUT_MODES[name]], _cache["y_train"]
+    scores, fit_seconds, predict_seconds = [], 0.0, 0.0
+    for train_idx, val_idx in _cache["folds"]:
+        train_idx = _subsample(train_idx, fraction)
+        if len(np.unique(y[train_idx])) < 2:
+            continue
+        model = make_model(name, _cache["dataset"], _cache["encoder"], **params, **_threads(name, threads))
+        start_time = time.time()
+        fit_model(model, X.iloc[train_idx], y[train_idx], sample_weights(y[train_idx], _cache["dataset"]))
+        fit_seconds += time.time() - start_time
+        start_time = time.time()
+        y_score = model.predict_proba(X.iloc[val_idx])[:, 1]
+        predict_seconds += time.time() - start_time
+        scores.append(evaluate(y[val_idx], (y_score >= 0.5).astype(int), y_score))
+    return {
+        "model": name,
+        "params": params,
+        "fraction": fraction,
+        "cv_auc": _mean(scores, "auc"),
+        "cv_f1": _mean(scores, "f1"),
+        "cv_recall": _mean(scores, "recall"),
+        "cv_accuracy": _mean(scores, "accuracy"),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+    }
+
+
+def _threads(name, threads):
+    return {THREAD_PARAMS[name]: threads} if name in THREAD_PARAMS else {}
+
+
+def _mean(scores, metric):
+    values = [s[metric] for s in scores if metric in s]
+    return float(np.mean(values)) if values else float("nan")
+
+
+def _rank_key(result):
+    # AUC first (falls back to F1 when a validation fold has a single class)
+    auc = result["cv_auc"]
+    return (auc if not np.isnan(auc) else -1.0, result["cv_f1"])
+
+
+# -----------------------------
+# Successive halving
+# -----------------------------
+def successive_halving(pool, models, n_candidates=8, eta=3, min_fraction=0.1, threads=1):
+    """Run all models' candidates rung by rung over the pool; returns every evaluated result."""
+    candidates = {
+        name: [{}] + list(ParameterSampler(SEARCH_SPACES[name], n_iter=n_candidates - 1, random_state=42))
+        for name in models
+    }
+    n_rungs = max(int(np.floor(np.log(1 / min_fraction) / np.log(eta))) + 1, 1)
+    history = []
+    for rung in range(n_rungs):
+        fraction = min(1.0, eta ** (rung - n_rungs + 1))
+        tasks = [(name, params, fraction, threads) for name in models for params in candidates[name]]
+        logging.info(f"Rung {rung + 1}/{n_rungs}: {len(tasks)} candidates on {fraction:.0%} of the training rows")
+        results = list(pool.map(_evaluate_candidate, tasks))
+        history.extend(results)
+        for name in models:
+            ranked = sorted((r for r in results if r["model"] == name), key=_rank_key, reverse=True)
+            candidates[name] = [r["params"] for r in ranked[:max(len(ranked) // eta, 1)]]
+    return history
+
+
+def best_per_model(history):
+    final_fraction = max(r["fraction"] for r in history)
+    best = {}
+    for result in history:
+        if result["fraction"] != final_fraction:
+            continue
+        if result["model"] not in best or _rank_key(result) > _rank_key(best[result["model"]]):
+            best[result["model"]] = result
+    return best
+
+
+def refit_and_test(cache_path, best, output_dir=".", threads=1):
+    """Refit each model's best configuration on the 80% split and score the 20% test rows."""
+    cache = joblib.load(cache_path)
+    dataset, y_train, y_test = cache["dataset"], cache["y_train"], cache["y_test"]
+    rows = []
+    for name, result in best.items():
+        mode = INPUT_MODES[name]
+        model = make_model(name, dataset, cache["encoder"], **result["params"], **_threads(name, threads))
+        start_time = time.time()
+        fit_model(model, cache["train"][mode], y_train, sample_weights(y_train, dataset))
+        fit_seconds = time.time() - start_time
+        start_time = time.time()
+        y_score = model.predict_proba(cache["test"][mode])[:, 1]
+        y_pred = model.predict(cache["test"][mode])
+        predict_seconds = time.time() - start_time
+
+        metrics = evaluate(y_test, y_pred, y_score)
+        rows.append({
+            "model": name,
+            "params": json.dumps(result["params"]),
+            "cv_auc": result["cv_auc"],
+            "cv_f1": result["cv_f1"],
+            "accuracy": metrics["accuracy"],
+            "recall": metrics["recall"],
+            "f1": metrics["f1"],
+            "auc": metrics.get("auc", float("nan")),
+            "fit_seconds": round(fit_seconds, 3),
+            "predict_seconds": round(predict_seconds, 3),
+        })
+        filename = f"results_test_{dataset}_{name.lower().replace(' ', '_')}.csv"
+        results_frame(cache["X_test_raw"], y_test, y_pred).to_csv(os.path.join(output_dir, filename), index=False)
+    table = pd.DataFrame(rows).sort_values("auc", ascending=False)
+    table.to_csv(os.path.join(output_dir, f"model_comparison_{dataset}.csv"), index=False)
+    return table
+
+
+def run_search(dataset, models=tuple(INPUT_MODES), cv="random", n_splits=5, n_candidates=8, eta=3,
+               min_fraction=0.1, workers=None, threads=1, cache_dir="model_search_cache", output_dir="."):
+    cache_path = build_cache(dataset, cv, n_splits, models, cache_dir)
+    workers = workers or max((os.cpu_count() or 1) // threads, 1)
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_path,)) as pool:
+        history = successive_halving(pool, models, n_candidates, eta, min_fraction, threads)
+    logging.info(f"Search finished in {time.time() - start_time:.1f} seconds with {workers} workers")
+    pd.DataFrame(history).assign(params=lambda d: d["params"].map(json.dumps)).to_csv(
+        os.path.join(output_dir, f"model_search_{dataset}_{cv}.csv"), index=False
+    )
+    return refit_and_test(cache_path, best_per_model(history), output_dir, threads)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel model comparison and hyperparameter search.")
+    parser.add_argument("datasets", nargs="*", default=["maize", "chicken", "lentils"])
+    parser.add_argument("--models", nargs="+", default=list(INPUT_MODES), choices=list(INPUT_MODES))
+    parser.add_argument("--cv", choices=["random", "year"], default="random",
+                        help="Stratified random folds or out-of-time year folds")
+    parser.add_argument("--splits", type=int, default=5, help="Number of folds (year folds: last N years)")
+    parser.add_argument("--candidates", type=int, default=8, help="Initial candidates per model")
+    parser.add_argument("--eta", type=int, default=3, help="Halving factor")
+    parser.add_argument("--min-fraction", type=float, default=0.1, help="Share of training rows in the first rung")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=1, help="Threads per model fit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    for name in args.datasets:
+        table = run_search(name, args.models, args.cv, args.splits, args.candidates, args.eta,
+                           args.min_fraction, args.workers, args.threads)
+        print(table.to_string(index=False))
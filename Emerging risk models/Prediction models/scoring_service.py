@@ -0,0 +1,236 @@
+"""
+Batch and single-record scoring with persisted supply-chain models.
+
+A trained model is saved together with its fitted CategoricalEncoder as one bundle per supply
+chain (models/<dataset>.joblib) and loaded once:
+
+    python scoring_service.py train chicken
+    python scoring_service.py score chicken new_records.csv --output scored.csv
+    python scoring_service.py bench chicken
+
+    from scoring_service import RiskScorer
+    scorer = RiskScorer.load("chicken")
+    scorer.score_record({"month": 5, "origin_code3": "BRA", ...})   # {"predict": 1, "probability": 0.83}
+
+"predict" is the class label of model.predict, as in the notebooks' results_test_maize.csv;
+"probability" is the predicted probability of exceeding the LOQ. Large files are scored in
+streaming chunks, and single records of XGBoost/LightGBM models skip pandas entirely.
+"""
+import os
+import time
+import json
+import argparse
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_loader import TARGET
+from training_pipeline import train
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+
+def bundle_path(dataset, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f"{dataset}.joblib")
+
+
+def save_bundle(dataset, model, encoder, mode, model_name, metrics=None, model_dir=MODEL_DIR, training=None):
+    """training: how the model was last fitted (strategy, rows, year range), see incremental_training.py"""
+    os.makedirs(model_dir, exist_ok=True)
+    bundle = {
+        "dataset": dataset,
+        "model_name": model_name,
+        "model": model,
+        "encoder": encoder,
+        "mode": mode,
+        "metrics": metrics or {},
+        "training": training or {},
+        "trained": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    path = bundle_path(dataset, model_dir)
+    joblib.dump(bundle, path)
+    return path
+
+
+def train_and_save(dataset, model_name="XGBoost", model_dir=MODEL_DIR, **params):
+    """Train with the shared pipeline (notebook split and weights) and persist model + encoder."""
+    result = train(dataset, model_name, **params)
+    metrics = {k: v for k, v in result["metrics"].items() if k != "confusion_matrix"}
+    return save_bundle(dataset, result["model"], result["encoder"], result["mode"], model_name, metrics, model_dir)
+
+
+# -----------------------------
+# Scorer
+# -----------------------------
+class RiskScorer:
+    def __init__(self, bundle):
+        self.dataset = bundle["dataset"]
+        self.model_name = bundle["model_name"]
+        self.model = bundle["model"]
+        self.encoder = bundle["encoder"]
+        self.mode = bundle["mode"]
+        self.metrics = bundle.get("metrics", {})
+        self.training = bundle.get("training", {})
+        self.features = list(self.encoder.columns_)
+
+        # single-record fast path: category -> code lookups and the raw booster
+        self._codes = {
+            column: {value: code for code, value in enumerate(categories)}
+            for column, categories in self.encoder.categories_.items()
+        }
+        self._booster = None
+        if self.model_name == "XGBoost":
+            self._booster = self.model.get_booster()
+        elif self.model_name == "LightGBM":
+            self._booster = self.model.booster_
+
+    @classmethod
+    def load(cls, dataset, model_dir=MODEL_DIR):
+        return cls(joblib.load(bundle_path(dataset, model_dir)))
+
+    # -----------------------------
+    # Batch scoring
+    # -----------------------------
+    def score_frame(self, df):
+        """Score a frame holding (at least) the feature columns; returns predict and probability."""
+        X = self.encoder.transform(df, self.mode)
+        return pd.DataFrame({
+            "predict": self.model.predict(X).astype("int8"),
+            "probability": self.model.predict_proba(X)[:, 1].astype("float32"),
+        }, index=df.index)
+
+    def _read_chunks(self, path, chunksize):
+        categorical = set(self.encoder.categorical_columns)
+        wanted = set(self.features) | {TARGET}
+        return pd.read_csv(
+            path, chunksize=chunksize, usecols=lambda c: c in wanted,
+            dtype={c: (str if c in categorical else "float32") for c in wanted}
+        )
+
+    def score_file(self, path, output, chunksize=50000):
+        """
+        Stream a CSV (optionally zipped) through the model chunk by chunk and write the
+        feature columns, the target when present, and the predict/probability columns.
+        """
+        rows = 0
+        start_time = time.time()
+        for i, chunk in enumerate(self._read_chunks(path, chunksize)):
+            scores = self.score_frame(chunk)
+            columns = self.features + ([TARGET] if TARGET in chunk else [])
+            pd.concat([chunk[columns], scores], axis=1).to_csv(
+                output, mode="w" if i == 0 else "a", header=(i == 0), index=False
+            )
+            rows += len(chunk)
+        elapsed_time = time.time() - start_time
+        return {"rows": rows, "seconds": round(elapsed_time, 3),
+                "rows_per_s": round(rows / elapsed_time, 1) if elapsed_time else None}
+
+    # -----------------------------
+    # Single records
+    # -----------------------------
+    def _vector(self, record):
+        row = np.full((1, len(self.features)), np.nan, dtype=np.float32)
+        for i, column in enumerate(self.features):
+            value = record.get(column)
+            if value is None or value != value:
+                continue
+            if column in self._codes:
+                code = self._codes[column].get(str(value))
+                if code is not None:
+                    row[0, i] = code
+            else:
+                row[0, i] = value
+        return row
+
+    def score_record(self, record):
+        """Score one monitoring record given as a dict of feature values (missing keys are NaN)."""
+        if self._booster is None:
+            scores = self.score_frame(pd.DataFrame([record], columns=self.features))
+            return {"predict": int(scores["predict"].iloc[0]), "probability": float(scores["probability"].iloc[0])}
+        row = self._vector(record)
+        if self.model_name == "XGBoost":
+            import xgboost
+            matrix = xgboost.DMatrix(row, feature_names=self._booster.feature_names,
+                                     feature_types=self._booster.feature_types, enable_categorical=True)
+            probability = float(self._booster.predict(matrix)[0])
+        else:
+            probability = float(self._booster.predict(row)[0])
+        # XGBClassifier and LGBMClassifier predict class 1 above 0.5
+        return {"predict": int(probability > 0.5), "probability": probability}
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def benchmark(scorer, df, n_records=1000, batch_repeats=3):
+    """Batch rows/s over the whole frame and single-record latency percentiles."""
+    batch_seconds = []
+    for _ in range(batch_repeats):
+        start_time = time.perf_counter()
+        scores = scorer.score_frame(df)
+        batch_seconds.append(time.perf_counter() - start_time)
+
+    records = df[scorer.features].head(n_records).to_dict("records")
+    latencies, mismatches = [], 0
+    for i, record in enumerate(records):
+        start_time = time.perf_counter()
+        result = scorer.score_record(record)
+        latencies.append(time.perf_counter() - start_time)
+        mismatches += int(result["predict"] != scores["predict"].iloc[i])
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "dataset": scorer.dataset,
+        "model": scorer.model_name,
+        "batch": {"rows": len(df), "seconds": round(min(batch_seconds), 3),
+                  "rows_per_s": round(len(df) / min(batch_seconds), 1)},
+        "single_record_ms": {
+            "records": len(records),
+            "p50": round(float(np.percentile(latencies, 50)), 3),
+            "p99": round(float(np.percentile(latencies, 99)), 3),
+            "max": round(float(latencies.max()), 3),
+        },
+        "single_vs_batch_mismatches": mismatches,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Persist, serve and benchmark the supply-chain risk models.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="Train with the shared pipeline and save the bundle")
+    train_parser.add_argument("datasets", nargs="+")
+    train_parser.add_argument("--model", default="XGBoost")
+
+    score_parser = subparsers.add_parser("score", help="Score a CSV file in streaming chunks")
+    score_parser.add_argument("dataset")
+    score_parser.add_argument("input")
+    score_parser.add_argument("--output", default=None)
+    score_parser.add_argument("--chunksize", type=int, default=50000)
+
+    bench_parser = subparsers.add_parser("bench", help="Batch rows/s and single-record latency")
+    bench_parser.add_argument("datasets", nargs="+")
+    bench_parser.add_argument("--records", type=int, default=1000)
+    bench_parser.add_argument("--output", default="scoring_benchmark.json")
+
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    args = parser.parse_args()
+
+    if args.command == "train":
+        for name in args.datasets:
+            print(f"Saved {train_and_save(name, args.model, args.model_dir)}")
+    elif args.command == "score":
+        scorer = RiskScorer.load(args.dataset, args.model_dir)
+        output = args.output or os.path.splitext(args.input)[0] + "_scored.csv"
+        print(json.dumps(scorer.score_file(args.input, output, args.chunksize), indent=2))
+    else:
+        from data_loader import load_dataset
+
+        reports = []
+        for name in args.datasets:
+            scorer = RiskScorer.load(name, args.model_dir)
+            reports.append(benchmark(scorer, load_dataset(name, columns=scorer.features), args.records))
+            print(json.dumps(reports[-1], indent=2))
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
@@ -1,29 +1,33 @@
 import pandas as pd
 import json
 import time
+import logging
 import torch
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from umap import UMAP
-from hdbscan import HDBSCAN
-from sklearn.feature_extraction.text import CountVectorizer
-from bertopic import BERTopic
-from bertopic.representation import KeyBERTInspired
 import plotly.express as px
-from datetime import datetime
+from topic_pipeline import build_topic_model, fit_online
+from search_index import build_index
+from novelty_detector import save_centroids
+from instrumentation import start_run, stage, count, instrument, begin_stage, end_stage, write_report
 
-print("CUDA available:", torch.cuda.is_available())
+run = start_run("bertopic_json")
+logging.info(f"CUDA available: {torch.cuda.is_available()}")
 start_time = time.time()
 
+# "count" rebuilds the full vocabulary every run, "online" keeps it bounded (see topic_pipeline.py)
+VECTORIZER_MODE = "count"
+BATCH_SIZE = 1000
+
 # -----------------------------
 # Load Data from JSON
 # -----------------------------
 input_json = "data.json"  # Update with your JSON file path
-with open(input_json, "r", encoding="utf-8") as f:
-    data = json.load(f)
-df = pd.DataFrame(data)
-print("Data preview:")
-print(df.head())
+with stage("load"):
+    with open(input_json, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    df = pd.DataFrame(data)
+logging.debug(f"Data preview:\n{df.head()}")
 
 # Extract documents, dates, and URLs.
 documents = df["Summary"].to_list()
@@ -32,49 +36,31 @@ dates = pd.to_datetime(df["Scrape Date"]).tolist()
 # -----------------------------
 # Topic Modeling Pipeline Setup
 # -----------------------------
-embedding_model = SentenceTransformer("intfloat/multilingual-e5-large-instruct")
-embeddings = embedding_model.encode(documents, show_progress_bar=True)
-
-umap_model = UMAP(
-    n_neighbors=15,
-    n_components=5,
-    min_dist=0.0,
-    metric="cosine",
-    random_state=42
-)
-hdbscan_model = HDBSCAN(
-    min_cluster_size=3,
-    metric="euclidean",
-    cluster_selection_method="eom",
-    prediction_data=True
-)
-vectorizer_model = CountVectorizer(
-    stop_words="english",
-    min_df=2,
-    ngram_range=(1, 2)
-)
-
-# Representation model
-keybert_model = KeyBERTInspired()
-representation_model = {"KeyBERT": keybert_model}
-
-topic_model = BERTopic(
-    embedding_model=embedding_model,
-    umap_model=umap_model,
-    hdbscan_model=hdbscan_model,
-    vectorizer_model=vectorizer_model,
-    representation_model=representation_model,
-    top_n_words=10,
-    verbose=True
-)
+with stage("load_model"):
+    embedding_model = SentenceTransformer("intfloat/multilingual-e5-large-instruct")
+with stage("embedding"):
+    embeddings = embedding_model.encode(documents, show_progress_bar=True)
+count("docs_embedded", len(documents))
+np.save("embeddings.npy", embeddings)  # reused by search_index.py and later runs
+
+topic_model = build_topic_model(embedding_model, vectorizer_mode=VECTORIZER_MODE)
+# UMAP and HDBSCAN (or their online counterparts) reported as their own stages
+instrument(topic_model.umap_model, run, "dimensionality_reduction")
+instrument(topic_model.hdbscan_model, run, "clustering")
 
 # -----------------------------
 # Train Topic Model
 # -----------------------------
-topics, probs = topic_model.fit_transform(documents, embeddings)
+with stage("topic_fit"):
+    if VECTORIZER_MODE == "online":
+        # Bounded-memory mode: update the topic representations batch by batch
+        topics = fit_online(topic_model, documents, embeddings, batch_size=BATCH_SIZE)
+        probs = [np.nan] * len(topics)
+    else:
+        topics, probs = topic_model.fit_transform(documents, embeddings)
 topic_info = topic_model.get_topic_info()
-print("Topic info preview:")
-print(topic_info.head())
+count("topics", int((topic_info.Topic != -1).sum()))
+logging.info(f"Topic info preview:\n{topic_info.head()}")
 
 # -----------------------------
 # Augment original DataFrame with topic assignments
@@ -97,10 +83,19 @@ df["Topic_Keywords"] = df["Assigned_Topic"].apply(lambda t: topic_keywords(t, to
 # Save augmented data back to JSON
 # -----------------------------
 output_json = "input_with_topics.json"
-records = df.to_dict(orient="records")
-with open(output_json, "w", encoding="utf-8") as f:
-    json.dump(records, f, ensure_ascii=False, indent=2)
-print(f"Augmented data with topic assignments saved to {output_json}")
+with stage("save"):
+    records = df.to_dict(orient="records")
+    with open(output_json, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+logging.info(f"Augmented data with topic assignments saved to {output_json}")
+
+# Persistent search index over articles, topics and URLs (query with search_index.py)
+with stage("search_index"):
+    search_index = build_index(records, embeddings, "search_index")
+logging.info(f"Search index with {len(search_index)} articles saved to search_index/")
+
+# Topic centroids for the streaming emerging-risk detector (novelty_detector.py)
+save_centroids("topic_centroids.npz", topics, embeddings)
 
 # -----------------------------
 # Create Custom Labels for Pie Chart
@@ -122,16 +117,15 @@ df_topics = pd.DataFrame({
     "Topic": topics,
     "URL": df["URL"].tolist()
 })
-rep_docs = {}
-for topic_num in sorted(df_topics["Topic"].unique()):
-    if topic_num == -1:
-        continue
-    docs = (
-        df_topics[df_topics["Topic"] == topic_num]
-        [["Document", "URL"]]
+# Single pass over all documents instead of one scan per topic
+rep_docs = {
+    topic_num: docs[["Document", "URL"]].head(50).to_dict(orient="records")
+    for topic_num, docs in (
+        df_topics[df_topics["Topic"] != -1]
         .drop_duplicates()
+        .groupby("Topic", sort=True)
     )
-    rep_docs[topic_num] = docs.head(50).to_dict(orient="records")
+}
 
 def rep_docs_to_string(topic_num):
     if topic_num in rep_docs:
@@ -147,6 +141,7 @@ filtered_info["RepDocs"] = filtered_info["Topic"].apply(rep_docs_to_string)
 # -----------------------------
 # Visualizations
 # -----------------------------
+begin_stage("plotting")
 # 1. Intertopic Distance Map
 fig_topics = topic_model.visualize_topics()
 fig_topics.write_html("intertopic_distance.html")
@@ -243,7 +238,7 @@ with open(html_filename, "r+", encoding="utf-8") as f:
     f.write(html_content)
     f.truncate()
 
-print("Interactive pie chart saved as:", html_filename)
+logging.info(f"Interactive pie chart saved as: {html_filename}")
 
 # 4. Total Distribution Bar Chart
 fig_total = px.bar(
@@ -273,6 +268,9 @@ fig_topics_over_time.write_html("topics_over_time.html")
 fig_hierarchy = topic_model.visualize_hierarchy(top_n_topics=20)
 fig_hierarchy.write_html("topic_hierarchy.html")
 
+end_stage()
+
 elapsed_time = time.time() - start_time
-print(f"Topic Modeling and Visualization took {elapsed_time:.2f} seconds.")
+logging.info(f"Topic Modeling and Visualization took {elapsed_time:.2f} seconds.")
+write_report()
 
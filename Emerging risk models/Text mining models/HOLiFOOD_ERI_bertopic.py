@@ -9,13 +9,17 @@ from sklearn.feature_extraction.text import CountVectorizer
 from bertopic.representation import KeyBERTInspired
 from keybert import KeyBERT
 import plotly.io as pio
+import logging
+from instrumentation import start_run, stage, count, instrument, begin_stage, end_stage, write_report
 
-print(torch.cuda.is_available())
+run = start_run("bertopic")
+logging.info(f"CUDA available: {torch.cuda.is_available()}")
 start_time = time.time()
 
 # Read csv file
-df = pd.read_csv('cleaned_data2.csv')
-print(df.head())
+with stage("load"):
+    df = pd.read_csv('cleaned_data2.csv')
+logging.debug(f"Data preview:\n{df.head()}")
 
 urls = df['url'].to_list()
 titles = df['content'].tolist()
@@ -25,14 +29,19 @@ dates = df['date'].apply(lambda x: pd.Timestamp(x)).to_list()
 titles = [str(title) for title in titles if isinstance(title, str) and not pd.isna(title)]
 
 # Pre-calculate embeddings with the highest performing sentence transformer
-embedding_model = SentenceTransformer("all-mpnet-base-v2")
-embeddings = embedding_model.encode(titles, show_progress_bar=True)
+with stage("load_model"):
+    embedding_model = SentenceTransformer("all-mpnet-base-v2")
+with stage("embedding"):
+    embeddings = embedding_model.encode(titles, show_progress_bar=True)
+count("docs_embedded", len(titles))
 
 # Dimensionality reduction with modified parameters
 umap_model = UMAP(n_neighbors=14, n_components=5, min_dist=0.0, metric='cosine', random_state=42)
+instrument(umap_model, run, "umap")
 
 # Clustering with reduced clustersize
 hdbscan_model = HDBSCAN(min_cluster_size=3, metric='euclidean', cluster_selection_method='eom', prediction_data=True)
+instrument(hdbscan_model, run, "hdbscan")
 
 # Tokenizer
 vectorizer_model = CountVectorizer(stop_words="english", min_df=2, ngram_range=(1, 2))
@@ -60,17 +69,20 @@ topic_model = BERTopic(
 )
 
 # Train model
-topics, probs = topic_model.fit_transform(titles, embeddings)
+with stage("topic_fit"):
+    topics, probs = topic_model.fit_transform(titles, embeddings)
 
 # Identified topics descriptives
 freq = topic_model.get_topic_info()
-print("Number of topics: {}".format(len(freq)))
-print(freq.head())
+count("topics", len(freq))
+logging.info("Number of topics: {}".format(len(freq)))
+logging.info(f"Topic info preview:\n{freq.head()}")
 
 # Show topics
 topic_model.get_topic_info()
 
 # Visualize intertopic distance
+begin_stage("plotting")
 topic_model.visualize_topics().show()   
 
 # Visualize Topics using Bar Chart
@@ -90,37 +102,40 @@ topic_model.visualize_heatmap(n_clusters=30, width=1000, height=1000).show()
 
 # Visualize Documents with plotly
 #topic_model.visualize_documents(titles, embeddings=embeddings)
+end_stage()
 
 # Select most 5 similar topics
 similar_topics, similarity = topic_model.find_topics("food security", top_n=5)
-print(similar_topics)
+logging.info(f"Most similar topics: {similar_topics}")
 most_similar = similar_topics[0]
-print("Most Similar Topic Info: \n{}".format(topic_model.get_topic(most_similar)))
-print("Similarity Score: {}".format(similarity[0]))
+logging.info("Most Similar Topic Info: \n{}".format(topic_model.get_topic(most_similar)))
+logging.info("Similarity Score: {}".format(similarity[0]))
 
 # Add topics, URLs, and dates to the DataFrame
 df = pd.DataFrame({"Document": titles, "Topic": topics, "url": urls, "Date": dates})
 
 elapsed_time = time.time() - start_time
-print(f"Topic Modeling took {elapsed_time:.2f} seconds.")
+logging.info(f"Topic Modeling took {elapsed_time:.2f} seconds.")
 
-topics, _ = topic_model.fit_transform(titles, embeddings)
+with stage("topic_fit"):
+    topics, _ = topic_model.fit_transform(titles, embeddings)
 df = pd.DataFrame({"Document": titles, "Topic": topics, "Date": dates})
-print(df)
+logging.debug(f"Documents with topics:\n{df}")
 
 topic_number = 3
 topic_model.get_topic_info(topic_number)
 documents_from_topic = [doc for doc, topic in zip(titles, topics) if topic == topic_number]
 
 # Print documents or process them further
-print("Documents from Topic #10:")
+logging.info(f"Documents from Topic #{topic_number}:")
 for doc in documents_from_topic:
-    print(doc)
+    logging.info(doc)
 
 kw_model = KeyBERT()  # Now KeyBERT is defined
 
 # Get the keyphrases for each document
-keyphrases = [kw_model.extract_keywords(doc) for doc in titles]
+with stage("keyphrases"):
+    keyphrases = [kw_model.extract_keywords(doc) for doc in titles]
 keyphrases = ["; ".join([kw[0] for kw in kp]) for kp in keyphrases]  # Convert list of tuples to string
 
 # Add the topics, keyphrases, URLs, and dates to the DataFrame
@@ -130,18 +145,21 @@ df['url'] = urls
 df['Date'] = dates
 
 # Print column names to verify
-print(df.columns)
+logging.debug(f"Columns: {list(df.columns)}")
 
 # Save the updated DataFrame to the original CSV file
 updated_data_file_path = 'eriscrape_withtopics.csv'
-df.to_csv(updated_data_file_path, index=False)
-print(f"Updated data saved to {updated_data_file_path}")
+with stage("save"):
+    df.to_csv(updated_data_file_path, index=False)
+logging.info(f"Updated data saved to {updated_data_file_path}")
 
 # Save documents with their categories to a new file
 documents_with_categories_file_path = 'eriscrape_withtopicdefinitions3.csv'
-df[['Document', 'Topic_ID', 'KeyBERT_Keywords', 'Date']].to_csv(documents_with_categories_file_path, index=False)
-print(f"Documents with categories saved to {documents_with_categories_file_path}")
+with stage("save"):
+    df[['Document', 'Topic_ID', 'KeyBERT_Keywords', 'Date']].to_csv(documents_with_categories_file_path, index=False)
+logging.info(f"Documents with categories saved to {documents_with_categories_file_path}")
 
+begin_stage("plotting")
 reduced_embeddings = UMAP(n_neighbors=10, n_components=2, min_dist=0.0, metric='cosine').fit_transform(embeddings)
 topic_model.visualize_document_datamap(titles, embeddings=embeddings)
 
@@ -163,3 +181,5 @@ pio.write_html(fig_hierarchy, file="hierarchy_visualization.html", auto_open=Tru
 # Visualize topics over time
 fig_dynamictopics = topic_model.visualize_topics_over_time(topics_over_time, topics=[0,1,2,3,4,5,7,9,10,11,12,13,14,16,20,22,23,24,25,26,27,28])
 pio.write_html(fig_dynamictopics, file="dynamictopics.html", auto_open=True)
+end_stage()
+write_report()
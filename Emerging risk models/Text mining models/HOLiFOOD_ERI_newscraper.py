@@ -5,9 +5,10 @@ from requests.exceptions import RequestException
 import csv
 import os
 import logging
+from instrumentation import setup_logging, start_run, stage, count, write_report
 
 # Setup logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+setup_logging()
 
 def scrape_url(url):
     headers = {
@@ -15,7 +16,10 @@ def scrape_url(url):
     }
     try:
         logging.info(f"Scraping URL: {url}")
-        response = requests.get(url, headers=headers, timeout=10)
+        with stage("fetch"):
+            response = requests.get(url, headers=headers, timeout=10)
+        count("urls_fetched")
+        count("bytes_fetched", len(response.content))
         response.raise_for_status()  # Raises an HTTPError for bad responses
 
         # Check if the Content-Type header is 'text/html'
@@ -24,11 +28,14 @@ def scrape_url(url):
             logging.warning(f"Invalid Content-Type: {content_type} for URL: {url}")
             return None, f"Invalid Content-Type: {content_type}"
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        text = soup.get_text(separator=' ', strip=True)
-        text = text.replace('\n', ' ').replace('\r', ' ')
+        with stage("extract"):
+            soup = BeautifulSoup(response.text, 'html.parser')
+            text = soup.get_text(separator=' ', strip=True)
+            text = text.replace('\n', ' ').replace('\r', ' ')
+        count("articles_extracted")
         return text, None
     except RequestException as e:
+        count("fetch_errors")
         logging.error(f"Error scraping URL: {url} - {e}")
         return None, str(e)
 
@@ -72,6 +79,7 @@ def process_file(file_path, output_directory):
                 logging.info(f"Successfully scraped and logged URL: {url}")
 
 def main():
+    start_run("newscraper")
     # Get the directory where the script is located
     directory = os.path.dirname(os.path.abspath(__file__))
     output_directory = os.path.join(directory, 'scraped_output')
@@ -95,6 +103,7 @@ def main():
     if not csv_files_found:
         logging.info("No CSV files found in the directory.")
     logging.info("Completed processing all files.")
+    write_report()
 
 if __name__ == "__main__":
     main()
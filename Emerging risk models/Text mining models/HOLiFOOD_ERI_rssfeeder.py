@@ -2,22 +2,30 @@ import feedparser
 import csv
 from datetime import datetime, timedelta
 import time
+import logging
+from instrumentation import start_run, stage, count, write_report
+
+RSS_BASE_URL = "https://emm.newsbrief.eu/rss/rss"
 
 # Get the current system date
-def generate_rss_urls():
-    current_date = datetime.utcnow().date()
+def generate_rss_urls(current_date=None):
+    if current_date is None:
+        current_date = datetime.utcnow().date()
     return [
-        f"https://emm.newsbrief.eu/rss/rss?language=en&type=search&mode=advanced&dateto={current_date}T05%3A59%3A59Z&datefrom={current_date}T00%3A00%3A00Z&category=FoodSafety",
-        f"https://emm.newsbrief.eu/rss/rss?language=en&type=search&mode=advanced&dateto={current_date}T11%3A59%3A59Z&datefrom={current_date}T06%3A00%3A00Z&category=FoodSafety",
-        f"https://emm.newsbrief.eu/rss/rss?language=en&type=search&mode=advanced&dateto={current_date}T17%3A59%3A59Z&datefrom={current_date}T12%3A00%3A00Z&category=FoodSafety",
-        f"https://emm.newsbrief.eu/rss/rss?language=en&type=search&mode=advanced&dateto={current_date}T23%3A59%3A59Z&datefrom={current_date}T18%3A00%3A00Z&category=FoodSafety"
+        f"{RSS_BASE_URL}?language=en&type=search&mode=advanced&dateto={current_date}T05%3A59%3A59Z&datefrom={current_date}T00%3A00%3A00Z&category=FoodSafety",
+        f"{RSS_BASE_URL}?language=en&type=search&mode=advanced&dateto={current_date}T11%3A59%3A59Z&datefrom={current_date}T06%3A00%3A00Z&category=FoodSafety",
+        f"{RSS_BASE_URL}?language=en&type=search&mode=advanced&dateto={current_date}T17%3A59%3A59Z&datefrom={current_date}T12%3A00%3A00Z&category=FoodSafety",
+        f"{RSS_BASE_URL}?language=en&type=search&mode=advanced&dateto={current_date}T23%3A59%3A59Z&datefrom={current_date}T18%3A00%3A00Z&category=FoodSafety"
     ]
 
 # Function to parse RSS feeds and extract URLs and publication dates
 def parse_rss_feeds(rss_urls):
     news_data = []
     for url in rss_urls:
-        feed = feedparser.parse(url)
+        with stage("fetch"):
+            feed = feedparser.parse(url)
+        count("feeds_fetched")
+        count("entries_found", len(feed.entries))
         for entry in feed.entries:
             news_data.append({
                 "url": entry.link,
@@ -48,9 +56,13 @@ def save_data_to_csv(news_data, filename="news_data.csv"):
                 seen_urls.add(data["url"])
 
 # Run the script continuously
-while True:
-    rss_urls = generate_rss_urls()
-    news_data = parse_rss_feeds(rss_urls)
-    save_data_to_csv(news_data)
-    print("URLs and dates appended to news_data.csv")
-    time.sleep(86400)  # Wait for 1 day before running again
+if __name__ == "__main__":
+    while True:
+        start_run("rssfeeder")
+        rss_urls = generate_rss_urls()
+        news_data = parse_rss_feeds(rss_urls)
+        with stage("save"):
+            save_data_to_csv(news_data)
+        logging.info(f"{len(news_data)} URLs and dates appended to news_data.csv")
+        write_report()
+        time.sleep(86400)  # Wait for 1 day before running again
@@ -3,10 +3,12 @@ import requests
 from bs4 import BeautifulSoup
 from requests.exceptions import RequestException
 import json
+import logging
 from datetime import datetime
+from instrumentation import start_run, stage, count, write_report
 
 def scrape_url(url):
-    print(f"[DEBUG] Scraping URL: {url}")
+    logging.debug(f"Scraping URL: {url}")
     headers = {
         'User-Agent': (
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
@@ -17,36 +19,42 @@ def scrape_url(url):
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
     }
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        with stage("fetch"):
+            response = requests.get(url, headers=headers, timeout=10)
+        count("urls_fetched")
+        count("bytes_fetched", len(response.content))
         response.raise_for_status()
         content_type = response.headers.get('Content-Type', '')
         if "text/html" not in content_type:
-            print(f"[DEBUG] URL {url} returned non-HTML content: {content_type}")
+            logging.warning(f"URL {url} returned non-HTML content: {content_type}")
             return None, f"Non-HTML content: {content_type}"
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        for tag in soup(["script", "style", "header", "footer", "nav", "aside", "form", "noscript"]):
-            tag.decompose()
-        main_content = soup.find('main')
-        if main_content:
-            text = main_content.get_text(separator=' ', strip=True)
-        else:
-            text = soup.get_text(separator=' ', strip=True)
-        text = " ".join(text.split())
-        print(f"[DEBUG] Successfully scraped URL: {url}")
+        with stage("extract"):
+            soup = BeautifulSoup(response.text, 'html.parser')
+            for tag in soup(["script", "style", "header", "footer", "nav", "aside", "form", "noscript"]):
+                tag.decompose()
+            main_content = soup.find('main')
+            if main_content:
+                text = main_content.get_text(separator=' ', strip=True)
+            else:
+                text = soup.get_text(separator=' ', strip=True)
+            text = " ".join(text.split())
+        count("articles_extracted")
+        logging.debug(f"Successfully scraped URL: {url}")
         return text, None
     except RequestException as e:
-        print(f"[DEBUG] Error scraping URL: {url} | Error: {str(e)}")
+        count("fetch_errors")
+        logging.warning(f"Error scraping URL: {url} | Error: {str(e)}")
         return None, str(e)
 
 def process_json_file(json_path, output_directory):
-    print(f"[DEBUG] Processing file: {json_path}")
+    logging.info(f"Processing file: {json_path}")
     # Load the JSON input
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
             url_records = json.load(f)
     except Exception as e:
-        print(f"[DEBUG] Error reading {json_path}: {e}")
+        logging.error(f"Error reading {json_path}: {e}")
         return
 
     # Remove duplicate URLs
@@ -57,7 +65,7 @@ def process_json_file(json_path, output_directory):
         if url and url not in seen_urls:
             unique_records.append(rec)
             seen_urls.add(url)
-    print(f"[DEBUG] Number of unique URLs after deduplication: {len(unique_records)}")
+    logging.info(f"Number of unique URLs after deduplication: {len(unique_records)}")
 
     # Create output filenames using today's date.
     today_str = datetime.now().strftime("%Y%m%d")
@@ -67,8 +75,8 @@ def process_json_file(json_path, output_directory):
     output_path = os.path.join(output_directory, output_filename)
     error_path = os.path.join(output_directory, error_filename)
 
-    print(f"[DEBUG] Output file will be: {output_path}")
-    print(f"[DEBUG] Error log file will be: {error_path}")
+    logging.debug(f"Output file will be: {output_path}")
+    logging.debug(f"Error log file will be: {error_path}")
 
     results = []
     errors = []
@@ -77,7 +85,7 @@ def process_json_file(json_path, output_directory):
     for idx, rec in enumerate(unique_records):
         url = rec['URL']
         scrape_date = rec.get('Scrape Date', '')
-        print(f"[DEBUG] Processing URL {idx}: {url}")
+        logging.debug(f"Processing URL {idx}: {url}")
         content, error = scrape_url(url)
         if error:
             errors.append({
@@ -93,23 +101,26 @@ def process_json_file(json_path, output_directory):
             })
 
     # Write results and errors to JSON files.
-    with open(output_path, mode='w', encoding='utf-8') as fout:
-        json.dump(results, fout, ensure_ascii=False, indent=4)
-    with open(error_path, mode='w', encoding='utf-8') as ferr:
-        json.dump(errors, ferr, ensure_ascii=False, indent=4)
+    with stage("save"):
+        with open(output_path, mode='w', encoding='utf-8') as fout:
+            json.dump(results, fout, ensure_ascii=False, indent=4)
+        with open(error_path, mode='w', encoding='utf-8') as ferr:
+            json.dump(errors, ferr, ensure_ascii=False, indent=4)
 
-    print(f"[DEBUG] Finished processing. Output saved to {output_path}")
+    logging.info(f"Finished processing {len(results)} articles ({len(errors)} errors). Output saved to {output_path}")
     return output_path
 
 def main():
+    start_run("article_scraper")
     directory = './'
     json_file = 'food_safety_links.json'
     json_path = os.path.join(directory, json_file)
     if not os.path.exists(json_path):
-        print(f"[DEBUG] File not found: {json_path}")
+        logging.error(f"File not found: {json_path}")
         return
-    print(f"[DEBUG] Found file: {json_path}")
+    logging.info(f"Found file: {json_path}")
     process_json_file(json_path, directory)
+    write_report()
 
 if __name__ == "__main__":
     main()
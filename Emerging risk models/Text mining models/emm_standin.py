@@ -0,0 +1,193 @@
+import time
+import random
+import threading
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# -----------------------------
+# Synthetic Corpus
+# -----------------------------
+# Latent "topics" so that BERTopic has real structure to find in the synthetic articles
+TOPICS = [
+    ("aflatoxin", ["maize", "peanuts", "pistachios", "figs"], ["mould", "drought", "storage", "border rejection"]),
+    ("salmonella", ["chicken", "eggs", "sesame paste", "chocolate"], ["outbreak", "recall", "hospitalised", "serotype"]),
+    ("listeria", ["cheese", "smoked salmon", "frozen vegetables", "deli meat"], ["recall", "pregnant", "deaths", "plant closure"]),
+    ("pesticide residues", ["lentils", "rice", "tea", "peppers"], ["chlorpyrifos", "maximum residue limit", "ethylene oxide", "import control"]),
+    ("avian influenza", ["poultry", "turkey", "ducks", "eggs"], ["culling", "farm", "H5N1", "trade ban"]),
+    ("food fraud", ["honey", "olive oil", "spices", "fish"], ["adulteration", "mislabelling", "investigation", "counterfeit"]),
+    ("heavy metals", ["baby food", "rice", "seaweed", "cocoa"], ["lead", "cadmium", "arsenic", "testing"]),
+    ("allergens", ["biscuits", "ready meals", "sauces", "bread"], ["undeclared milk", "peanut", "label", "withdrawal"]),
+]
+COUNTRIES = ["Italy", "Spain", "Turkey", "India", "Brazil", "Netherlands", "Nigeria", "China", "Ukraine", "Poland"]
+FILLER = [
+    "Authorities said further testing is under way.",
+    "The company said it is cooperating with the food safety agency.",
+    "Consumers are advised to check the batch numbers on the packaging.",
+    "Experts warned that climate conditions this season increased the risk.",
+    "The notification was shared through the rapid alert system.",
+    "Officials expect more results in the coming weeks.",
+]
+
+
+def generate_corpus(n_articles, seed=42, start_date=None, sentences=8):
+    """Synthetic EMM food safety articles: list of dicts with URL path, title, date, content and latent topic."""
+    rng = random.Random(seed)
+    start_date = start_date or datetime(2025, 1, 1)
+    articles = []
+    for i in range(n_articles):
+        hazard, products, contexts = rng.choice(TOPICS)
+        product = rng.choice(products)
+        country = rng.choice(COUNTRIES)
+        body = []
+        for _ in range(sentences):
+            context = rng.choice(contexts)
+            body.append(rng.choice([
+                f"{hazard.capitalize()} was detected in {product} from {country}, linked to {context}.",
+                f"Inspectors in {country} reported {context} after {hazard} findings in {product}.",
+                f"A new case of {hazard} in {product} has been connected to {context} in {country}.",
+                rng.choice(FILLER),
+            ]))
+        articles.append({
+            "id": i,
+            "path": f"/article/{i}",
+            "title": f"{hazard.capitalize()} found in {product} from {country}",
+            "date": start_date + timedelta(minutes=37 * i),
+            "content": " ".join(body),
+            "topic": hazard,
+        })
+    return articles
+
+
+# -----------------------------
+# Stand-in HTTP Server
+# -----------------------------
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8"):
+        body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.rng_uniform(0.5 * server.latency, 1.5 * server.latency))
+        server.count_request()
+        if server.error_rate and server.rng_uniform(0.0, 1.0) < server.error_rate:
+            return self._send(500, "<html><body>Internal Server Error</body></html>")
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/NewsBrief/dynamic":
+            return self._send(200, server.newsbrief_page(int(query.get("page", ["1"])[0])))
+        if url.path == "/rss/rss":
+            return self._send(200, server.rss_window(query), "application/rss+xml; charset=utf-8")
+        if url.path.startswith("/article/"):
+            try:
+                article = server.articles[int(url.path.rsplit("/", 1)[-1])]
+            except (ValueError, IndexError):
+                return self._send(404, "<html><body>Not Found</body></html>")
+            return self._send(200, server.article_html(article))
+        return self._send(404, "<html><body>Not Found</body></html>")
+
+
+class EMMStandIn(ThreadingHTTPServer):
+    """
+    Local stand-in for the EMM NewsBrief site, RSS endpoint and linked news articles.
+    latency is the mean per-request delay in seconds, error_rate the share of 500 responses.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, articles, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0,
+                 articles_per_page=20, seed=42):
+        super().__init__((host, port), _Handler)
+        self.articles = articles
+        self.latency = latency
+        self.error_rate = error_rate
+        self.articles_per_page = articles_per_page
+        self.requests_served = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def rng_uniform(self, a, b):
+        with self._lock:
+            return self._rng.uniform(a, b)
+
+    def count_request(self):
+        with self._lock:
+            self.requests_served += 1
+
+    def newsbrief_page(self, page_num):
+        start = (page_num - 1) * self.articles_per_page
+        boxes = "".join(
+            f'<div class="articlebox_big"><a href="{self.base_url}{a["path"]}">{escape(a["title"])}</a></div>'
+            for a in self.articles[start:start + self.articles_per_page]
+        )
+        return f"<html><body><div id='content'>{boxes}</div></body></html>"
+
+    def rss_window(self, query):
+        def parse(key):
+            value = query.get(key, [""])[0].rstrip("Z")
+            try:
+                return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S")
+            except ValueError:
+                return None
+        date_from, date_to = parse("datefrom"), parse("dateto")
+        items = "".join(
+            f"<item><title>{escape(a['title'])}</title><link>{self.base_url}{a['path']}</link>"
+            f"<pubDate>{format_datetime(a['date'])}</pubDate></item>"
+            for a in self.articles
+            if (date_from is None or a["date"] >= date_from) and (date_to is None or a["date"] <= date_to)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>EMM FoodSafety</title>{items}</channel></rss>"
+        )
+
+    def article_html(self, article):
+        paragraphs = "".join(
+            f"<p>{escape(s.rstrip('.'))}.</p>" for s in article["content"].split(". ") if s
+        )
+        return (
+            f"<html><head><title>{escape(article['title'])}</title><script>var x = 1;</script></head>"
+            f"<body><nav>Home | News</nav><main><h1>{escape(article['title'])}</h1>{paragraphs}</main>"
+            "<footer>Synthetic stand-in</footer></body></html>"
+        )
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    server = EMMStandIn(generate_corpus(200), port=8765, latency=0.05, error_rate=0.02)
+    print(f"Serving synthetic EMM stand-in on {server.base_url} (Ctrl+C to stop)")
+    print(f"  {server.base_url}/NewsBrief/dynamic?page=1")
+    print(f"  {server.base_url}/rss/rss?datefrom=2025-01-01T00:00:00Z&dateto=2025-01-01T23:59:59Z")
+    server.serve_forever()
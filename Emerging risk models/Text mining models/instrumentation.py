@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import logging
+import threading
+import tracemalloc
+import functools
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+try:
+    import psutil  # optional, peak working set on Windows
+except ImportError:
+    psutil = None
+
+# Environment switches, so the scripts keep running unchanged from the command line:
+#   HOLIFOOD_LOG_LEVEL   DEBUG / INFO / WARNING ... (default INFO)
+#   HOLIFOOD_TRACEMALLOC 1 to trace Python allocations per stage (slower)
+#   HOLIFOOD_PROFILE     1 to capture a cProfile dump per top-level stage
+#   HOLIFOOD_REPORT_DIR  where run reports and profiles are written (default ./run_reports)
+
+
+def setup_logging(level=None):
+    level = level or os.environ.get("HOLIFOOD_LOG_LEVEL", "INFO")
+    logging.basicConfig(level=level.upper(), format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def max_rss_mb():
+    """Peak resident memory of the process in MB, or None where it cannot be measured (Windows without psutil)."""
+    if resource is None:
+        peak = getattr(psutil.Process().memory_info(), "peak_wset", None) if psutil else None
+        return round(peak / 2**20, 1) if peak is not None else None
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / 2**20 if sys.platform == "darwin" else rss / 2**10, 1)
+
+
+def _flag(name):
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+
+# -----------------------------
+# Run Report
+# -----------------------------
+class RunReport:
+    """
+    Collects stage spans, counters and memory for one script run and writes them as JSON.
+    Stages can be nested; nested stages are reported as "parent/child". Nesting is tracked per
+    thread, so stages opened in worker threads (e.g. the summarizer timeout pool) are top-level.
+    """
+
+    def __init__(self, name, trace_memory=None, profile=None, report_dir=None):
+        self.name = name
+        self.started = datetime.now()
+        self.trace_memory = _flag("HOLIFOOD_TRACEMALLOC") if trace_memory is None else trace_memory
+        self.profile = _flag("HOLIFOOD_PROFILE") if profile is None else profile
+        self.report_dir = report_dir or os.environ.get("HOLIFOOD_REPORT_DIR", "run_reports")
+        self.stages = defaultdict(lambda: {"calls": 0, "seconds": 0.0, "max_seconds": 0.0,
+                                           "peak_traced_mb": 0.0})
+        self.counters = defaultdict(int)
+        self.profiles = {}
+        self._local = threading.local()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @property
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name):
+        path = "/".join([frame["name"] for frame in self._stack] + [name])
+        frame = {"name": name, "peak": 0}
+        if self.trace_memory:
+            if self._stack:
+                parent = self._stack[-1]
+                parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+        profiler = None
+        if self.profile and not self._stack:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler is active (Python 3.12+ allows only one)
+                profiler = None
+
+        self._stack.append(frame)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_time = time.perf_counter() - start_time
+            self._stack.pop()
+            if profiler is not None:
+                profiler.disable()
+                self._save_profile(path, profiler)
+
+            stats = self.stages[path]
+            stats["calls"] += 1
+            stats["seconds"] += elapsed_time
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed_time)
+            if self.trace_memory:
+                peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                stats["peak_traced_mb"] = max(stats["peak_traced_mb"], round(peak / 2**20, 2))
+                if self._stack:
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            logging.debug(f"Stage {path} took {elapsed_time:.3f} seconds")
+
+    def count(self, name, value=1):
+        self.counters[name] += value
+
+    def _save_profile(self, path, profiler):
+        os.makedirs(self.report_dir, exist_ok=True)
+        filename = os.path.join(
+            self.report_dir, f"{self.name}_{self.started:%Y%m%d_%H%M%S}_{path.replace('/', '_')}.prof"
+        )
+        profiler.dump_stats(filename)
+        self.profiles[path] = filename
+        logging.debug(f"Profile for stage {path} saved to {filename}")
+
+    def to_dict(self):
+        finished = datetime.now()
+        return {
+            "run": self.name,
+            "started": self.started.strftime("%Y-%m-%d %H:%M:%S"),
+            "finished": finished.strftime("%Y-%m-%d %H:%M:%S"),
+            "wall_seconds": round((finished - self.started).total_seconds(), 3),
+            "max_rss_mb": max_rss_mb(),
+            "stages": {
+                path: {**stats, "seconds": round(stats["seconds"], 3),
+                       "max_seconds": round(stats["max_seconds"], 3)}
+                for path, stats in self.stages.items()
+            },
+            "counters": dict(self.counters),
+            "profiles": self.profiles
+        }
+
+    def write(self, path=None):
+        if path is None:
+            os.makedirs(self.report_dir, exist_ok=True)
+            path = os.path.join(self.report_dir, f"{self.name}_{self.started:%Y%m%d_%H%M%S}.json")
+        report = self.to_dict()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logging.info(f"Run report saved to {path} ({report['wall_seconds']:.2f} seconds)")
+        return path
+
+
+def instrument(model, report, stage_name, methods=("fit", "transform", "fit_transform", "fit_predict", "partial_fit")):
+    """
+    Time the fit/transform calls of a pipeline component (e.g. UMAP or HDBSCAN inside BERTopic)
+    as a stage, without changing its class. The wrappers are instance attributes, so an
+    instrumented model should not be pickled (e.g. with topic_model.save).
+    """
+    for method in methods:
+        original = getattr(model, method, None)
+        if original is None:
+            continue
+
+        def timed(*args, _original=original, **kwargs):
+            if report._stack and report._stack[-1]["name"] == stage_name:
+                return _original(*args, **kwargs)  # e.g. fit_transform calling fit
+            with report.stage(stage_name):
+                return _original(*args, **kwargs)
+
+        setattr(model, method, functools.wraps(original)(timed))
+    return model
+
+
+# -----------------------------
+# Process-wide default report
+# -----------------------------
+_current = None
+
+
+def start_run(name, **kwargs):
+    global _current
+    setup_logging()
+    _current = RunReport(name, **kwargs)
+    return _current
+
+
+def current_run():
+    global _current
+    if _current is None:
+        _current = RunReport(os.path.splitext(os.path.basename(sys.argv[0] or "run"))[0] or "run")
+    return _current
+
+
+def stage(name):
+    return current_run().stage(name)
+
+
+def count(name, value=1):
+    current_run().count(name, value)
+
+
+# For flat scripts where wrapping a long section in a with-block would mean re-indenting it
+_open_stages = []
+
+
+def begin_stage(name):
+    span = stage(name)
+    span.__enter__()
+    _open_stages.append(span)
+
+
+def end_stage():
+    _open_stages.pop().__exit__(None, None, None)
+
+
+def write_report(path=None):
+    return current_run().write(path)
@@ -2,8 +2,10 @@ import requests
 from bs4 import BeautifulSoup
 import json
 import time
+import logging
 from datetime import datetime
 import os
+from instrumentation import start_run, stage, count, write_report
 
 BASE_URL = (
     "https://emm.newsbrief.eu/NewsBrief/dynamic"
@@ -22,10 +24,7 @@ HEADERS = {
 }
 
 def debug_page_content(page_num, html_content):
-    print("=" * 50)
-    print(f"Debug snippet for page {page_num}:")
-    print(html_content[:500])
-    print("=" * 50)
+    logging.debug(f"Debug snippet for page {page_num}:\n{html_content[:500]}")
 
 def scrape_all_pages_until_empty(max_hard_limit=5):
     page_num = 1
@@ -33,23 +32,27 @@ def scrape_all_pages_until_empty(max_hard_limit=5):
 
     while page_num <= max_hard_limit:
         url = BASE_URL.format(page_num=page_num)
-        print(f"Scraping page {page_num}: {url}")
-        resp = requests.get(url, headers=HEADERS)
+        logging.info(f"Scraping page {page_num}: {url}")
+        with stage("fetch"):
+            resp = requests.get(url, headers=HEADERS)
+        count("urls_fetched")
+        count("bytes_fetched", len(resp.content))
 
         if resp.status_code != 200:
-            print(f"Stopped at page {page_num} - status code {resp.status_code}")
+            logging.warning(f"Stopped at page {page_num} - status code {resp.status_code}")
             break
 
         html_content = resp.text
         debug_page_content(page_num, html_content)
 
-        soup = BeautifulSoup(html_content, "html.parser")
-        article_containers = soup.find_all("div", class_="articlebox_big")
+        with stage("extract"):
+            soup = BeautifulSoup(html_content, "html.parser")
+            article_containers = soup.find_all("div", class_="articlebox_big")
         if not article_containers:
-            print(f"No article containers found on page {page_num}, stopping.")
+            logging.info(f"No article containers found on page {page_num}, stopping.")
             break
 
-        print(f"Found {len(article_containers)} article containers on page {page_num}.")
+        logging.debug(f"Found {len(article_containers)} article containers on page {page_num}.")
         links_found_on_page = 0
         for article in article_containers:
             a_tag = article.find("a", href=True)
@@ -58,13 +61,14 @@ def scrape_all_pages_until_empty(max_hard_limit=5):
                 all_links.append({"URL": a_tag["href"], "Scrape Date": current_time})
                 links_found_on_page += 1
             else:
-                print("No <a> tag found in one of the article containers.")
+                logging.debug("No <a> tag found in one of the article containers.")
 
         if links_found_on_page == 0:
-            print(f"No links extracted from page {page_num}, stopping.")
+            logging.info(f"No links extracted from page {page_num}, stopping.")
             break
 
-        print(f"Extracted {links_found_on_page} links from page {page_num}.")
+        count("links_found", links_found_on_page)
+        logging.info(f"Extracted {links_found_on_page} links from page {page_num}.")
         page_num += 1
 
     return all_links
@@ -95,15 +99,18 @@ def save_links_to_json(links, json_filename="food_safety_links.json"):
     # Save back to file
     with open(json_filename, "w", encoding="utf-8") as f:
         json.dump(deduped_links, f, ensure_ascii=False, indent=2)
-    print(f"Saved {len(links)} new records to {json_filename} (total {len(deduped_links)} records).")
+    logging.info(f"Saved {len(links)} new records to {json_filename} (total {len(deduped_links)} records).")
 
 def main():
     while True:
-        print("\n--- Starting a new scraping session ---")
+        start_run("news_scraper")
+        logging.info("--- Starting a new scraping session ---")
         scraped_links = scrape_all_pages_until_empty(max_hard_limit=5)
-        print(f"Total links scraped this session: {len(scraped_links)}")
-        save_links_to_json(scraped_links)
-        print("Scraping session completed. Waiting 24 hours for the next run...\n")
+        logging.info(f"Total links scraped this session: {len(scraped_links)}")
+        with stage("save"):
+            save_links_to_json(scraped_links)
+        write_report()
+        logging.info("Scraping session completed. Waiting 24 hours for the next run...")
         time.sleep(86400)
 
 if __name__ == "__main__":
@@ -0,0 +1,299 @@
+import os
+import json
+import time
+import logging
+import argparse
+from collections import defaultdict, deque
+from datetime import datetime
+
+import numpy as np
+
+from instrumentation import setup_logging
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _parse_date(value):
+    """Scrape date of an article, or None when it is missing or cannot be parsed."""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(str(value), DATE_FORMAT)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+# -----------------------------
+# Topic Centroids
+# -----------------------------
+def compute_centroids(topics, embeddings):
+    """Mean embedding of every topic (outliers excluded), as stored after a BERTopic fit."""
+    topics = np.asarray(topics)
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    topic_ids = np.array(sorted(t for t in set(topics.tolist()) if t != -1), dtype=np.int64)
+    centroids = np.vstack([embeddings[topics == t].mean(axis=0) for t in topic_ids]) if len(topic_ids) \
+        else np.zeros((0, embeddings.shape[1]), dtype=np.float32)
+    return topic_ids, _normalize(centroids)
+
+
+def save_centroids(path, topics, embeddings):
+    topic_ids, centroids = compute_centroids(topics, embeddings)
+    np.savez(path, topic_ids=topic_ids, centroids=centroids)
+    return path
+
+
+def load_centroids(path):
+    data = np.load(path)
+    return data["topic_ids"], data["centroids"]
+
+
+# -----------------------------
+# Streaming Detector
+# -----------------------------
+class NoveltyDetector:
+    """
+    Scores one newly summarized and embedded article at a time against the persisted
+    topic centroids, without refitting the topic model.
+
+    - an article whose best centroid similarity is below assign_threshold is an outlier (topic -1)
+      and goes into a buffer of recent outliers; outliers older than window_hours (by article
+      date) expire, so only the recent-window density counts
+    - when an outlier and at least min_cluster_size - 1 buffered outliers are all pairwise similar
+      (>= cluster_similarity), an "emerging_cluster" alert is raised and those articles leave the buffer
+    - articles without a parseable Scrape Date are skipped (and logged)
+    - per-topic counts are kept per time bucket; a bucket exceeding spike_ratio times the mean of
+      the previous baseline_buckets (and at least min_spike_count) raises a "volume_spike" alert,
+      once the topic has baseline_buckets of history
+    - save_state()/load_state() carry the outlier buffer and the volume history from one run to the next
+    """
+
+    def __init__(self, topic_ids, centroids, assign_threshold=0.75, buffer_size=500,
+                 cluster_similarity=0.85, min_cluster_size=3, window_hours=72, bucket_hours=24,
+                 baseline_buckets=7, spike_ratio=3.0, min_spike_count=5, alerts_path=None):
+        self.topic_ids = np.asarray(topic_ids)
+        self.centroids = _normalize(centroids)
+        self.assign_threshold = assign_threshold
+        self.cluster_similarity = cluster_similarity
+        self.min_cluster_size = min_cluster_size
+        self.window_seconds = window_hours * 3600
+        self.bucket_seconds = bucket_hours * 3600
+        self.baseline_buckets = baseline_buckets
+        self.spike_ratio = spike_ratio
+        self.min_spike_count = min_spike_count
+        self.alerts_path = alerts_path
+
+        # outlier ring buffer: preallocated so each decision is a single matrix-vector product
+        dim = self.centroids.shape[1]
+        self.buffer = np.zeros((buffer_size, dim), dtype=np.float32)
+        self.buffer_records = [None] * buffer_size
+        self.buffer_used = np.zeros(buffer_size, dtype=bool)
+        self.buffer_time = np.zeros(buffer_size, dtype=np.float64)
+        self.buffer_next = 0
+
+        self.volume = defaultdict(lambda: deque(maxlen=baseline_buckets + 1))
+        self.spiked = set()
+        self.alerts = []
+
+    def _bucket(self, date):
+        return int(date.timestamp() // self.bucket_seconds)
+
+    def assign(self, vector):
+        if not len(self.topic_ids):
+            return -1, 0.0
+        scores = self.centroids @ vector
+        best = int(np.argmax(scores))
+        similarity = float(scores[best])
+        if similarity < self.assign_threshold:
+            return -1, similarity
+        return int(self.topic_ids[best]), similarity
+
+    def process(self, record, embedding):
+        """
+        Score one article and return its decision record, including any alerts it raised.
+        Returns None for an article without a parseable Scrape Date.
+        """
+        start_time = time.perf_counter()
+        date = _parse_date(record.get("Scrape Date", ""))
+        if date is None:
+            logging.warning(f"Skipping {record.get('URL', '')}: unparseable Scrape Date {record.get('Scrape Date')!r}")
+            return None
+        vector = _normalize(embedding)
+        topic, similarity = self.assign(vector)
+
+        alerts = []
+        if topic == -1:
+            alert = self._add_outlier(record, vector, date)
+        else:
+            alert = self._count_volume(topic, date)
+        if alert:
+            alerts.append(alert)
+            self._emit(alert)
+
+        return {
+            "URL": record.get("URL", ""),
+            "Scrape Date": date.strftime(DATE_FORMAT),
+            "Topic": topic,
+            "Similarity": round(similarity, 4),
+            "Alerts": alerts,
+            "Latency_ms": round((time.perf_counter() - start_time) * 1000, 3)
+        }
+
+    def _cluster_around(self, vector, date):
+        """
+        Buffered outliers forming a mutually similar group with the new vector: candidates are
+        added in order of similarity as long as they are similar to every member already in the group.
+        """
+        timestamp = date.timestamp()
+        # expire outliers that fell out of the recent window
+        self.buffer_used &= self.buffer_time >= timestamp - self.window_seconds
+        similarity = self.buffer @ vector
+        candidates = np.flatnonzero(self.buffer_used & (similarity >= self.cluster_similarity))
+        if len(candidates) + 1 < self.min_cluster_size:
+            return candidates[:0]
+        candidates = candidates[np.argsort(-similarity[candidates])]
+        pairwise = self.buffer[candidates] @ self.buffer[candidates].T >= self.cluster_similarity
+        group = []
+        for i in range(len(candidates)):
+            if pairwise[i, group].all():
+                group.append(i)
+        return candidates[group]
+
+    def _add_outlier(self, record, vector, date):
+        neighbours = self._cluster_around(vector, date)
+
+        if len(neighbours) + 1 >= self.min_cluster_size:
+            members = [self.buffer_records[i] for i in neighbours] + [record]
+            self.buffer_used[neighbours] = False
+            return {
+                "Type": "emerging_cluster",
+                "Date": date.strftime(DATE_FORMAT),
+                "Size": len(members),
+                "URLs": [m.get("URL", "") for m in members],
+                "Summaries": [str(m.get("Summary", ""))[:200] for m in members]
+            }
+
+        slot = self.buffer_next
+        self.buffer[slot] = vector
+        self.buffer_records[slot] = {"URL": record.get("URL", ""), "Summary": record.get("Summary", "")}
+        self.buffer_used[slot] = True
+        self.buffer_time[slot] = date.timestamp()
+        self.buffer_next = (slot + 1) % len(self.buffer)
+        return None
+
+    def _count_volume(self, topic, date):
+        bucket = self._bucket(date)
+        history = self.volume[topic]
+        if history and history[-1][0] == bucket:
+            history[-1][1] += 1
+        elif not history or history[-1][0] < bucket:
+            history.append([bucket, 1])
+        else:
+            return None  # late article for an older bucket, not counted
+
+        current = history[-1][1]
+        if history[0][0] > bucket - self.baseline_buckets:
+            return None  # not enough history for a baseline yet
+        # buckets without any article are missing from history and count as zero
+        baseline = sum(count for b, count in list(history)[:-1] if b >= bucket - self.baseline_buckets)
+        expected = max(baseline / self.baseline_buckets, 1.0)
+        if (current >= self.min_spike_count and current >= self.spike_ratio * expected
+                and (topic, bucket) not in self.spiked):
+            self.spiked.add((topic, bucket))
+            return {
+                "Type": "volume_spike",
+                "Date": date.strftime(DATE_FORMAT),
+                "Topic": topic,
+                "Count": current,
+                "Baseline": round(float(expected), 2)
+            }
+        return None
+
+    # -----------------------------
+    # State
+    # -----------------------------
+    def save_state(self, path):
+        """Outlier buffer to <path> (.npz), volume history and raised spikes to <path>.json."""
+        np.savez(path, buffer=self.buffer, buffer_used=self.buffer_used, buffer_time=self.buffer_time,
+                 buffer_next=self.buffer_next)
+        # a spike can only be raised again for the latest bucket of a topic
+        latest = {topic: history[-1][0] for topic, history in self.volume.items() if history}
+        state = {
+            "buffer_records": self.buffer_records,
+            "volume": {str(topic): [list(entry) for entry in history] for topic, history in self.volume.items()},
+            "spiked": sorted([topic, bucket] for topic, bucket in self.spiked if latest.get(topic) == bucket),
+        }
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        return path
+
+    def load_state(self, path):
+        data = np.load(path)
+        if data["buffer"].shape != self.buffer.shape:
+            raise ValueError(f"Saved outlier buffer {data['buffer'].shape} does not match the detector "
+                             f"{self.buffer.shape} (buffer_size, embedding dimension)")
+        self.buffer[:] = data["buffer"]
+        self.buffer_used[:] = data["buffer_used"]
+        self.buffer_time[:] = data["buffer_time"]
+        self.buffer_next = int(data["buffer_next"])
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self.buffer_records = state["buffer_records"]
+        self.volume.clear()
+        for topic, history in state["volume"].items():
+            self.volume[int(topic)].extend(history)
+        self.spiked = {(topic, bucket) for topic, bucket in state["spiked"]}
+        return self
+
+    def _emit(self, alert):
+        self.alerts.append(alert)
+        logging.warning(f"Alert: {alert['Type']} at {alert['Date']}")
+        if self.alerts_path:
+            with open(self.alerts_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream new articles through the emerging-risk detector.")
+    parser.add_argument("records", help="JSON list of summarized articles (URL, Scrape Date, Summary)")
+    parser.add_argument("embeddings", help=".npy embeddings of the same articles, in order")
+    parser.add_argument("--centroids", default="topic_centroids.npz")
+    parser.add_argument("--alerts", default="alerts.jsonl")
+    parser.add_argument("--output", default="novelty_decisions.json")
+    parser.add_argument("--state", default="novelty_state.npz",
+                        help="Outlier buffer and volume history carried over between runs")
+    args = parser.parse_args()
+    setup_logging()
+
+    with open(args.records, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    embeddings = np.load(args.embeddings)
+    topic_ids, centroids = load_centroids(args.centroids)
+
+    detector = NoveltyDetector(topic_ids, centroids, alerts_path=args.alerts)
+    if os.path.exists(args.state):
+        detector.load_state(args.state)
+    decisions = [detector.process(record, vector) for record, vector in zip(records, embeddings)]
+    skipped = sum(d is None for d in decisions)
+    decisions = [d for d in decisions if d is not None]
+    detector.save_state(args.state)
+
+    latencies = np.array([d["Latency_ms"] for d in decisions]) if decisions else np.zeros(1)
+    logging.info(f"Processed {len(decisions)} articles ({skipped} skipped), {len(detector.alerts)} alerts, "
+                 f"p50 {np.percentile(latencies, 50):.3f} ms, p99 {np.percentile(latencies, 99):.3f} ms per article")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(decisions, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tracemalloc
+import importlib.util
+from datetime import datetime
+
+import numpy as np
+
+from emm_standin import EMMStandIn, generate_corpus
+from instrumentation import max_rss_mb, setup_logging
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(filename, module_name):
+    """Import one of the text mining scripts by file name (several contain spaces)."""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# -----------------------------
+# Measurement Helpers
+# -----------------------------
+def summarize_latencies(latencies):
+    if not latencies:
+        return {}
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "p50": round(float(np.percentile(latencies, 50)), 3),
+        "p90": round(float(np.percentile(latencies, 90)), 3),
+        "p99": round(float(np.percentile(latencies, 99)), 3),
+        "max": round(float(latencies.max()), 3)
+    }
+
+
+def run_stage(name, items, fn):
+    """
+    Call fn once per item and report throughput, latency percentiles, errors and peak memory.
+    fn returns the number of output units it produced (links, articles, ...), or None for 1.
+    """
+    latencies, produced, errors = [], 0, 0
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        try:
+            result = fn(item)
+            produced += 1 if result is None else result
+        except Exception as e:
+            errors += 1
+            logging.debug(f"{name} failed on one item: {e}")
+        latencies.append(time.perf_counter() - t0)
+    elapsed_time = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report = {
+        "calls": len(latencies),
+        "produced": produced,
+        "errors": errors,
+        "seconds": round(elapsed_time, 3),
+        "throughput_per_s": round(produced / elapsed_time, 2) if elapsed_time else None,
+        "latency_ms": summarize_latencies(latencies),
+        "peak_traced_mb": round(peak / 2**20, 2)
+    }
+    logging.info(f"{name}: {produced} in {elapsed_time:.2f}s ({report['throughput_per_s']}/s)")
+    return report
+
+
+# -----------------------------
+# Tiny Local Models
+# -----------------------------
+def build_tiny_embedder(documents, dim=64):
+    """Hashing + SVD embedder, accepted by BERTopic as a scikit-learn embedding backend."""
+    from sklearn.pipeline import make_pipeline
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.decomposition import TruncatedSVD
+
+    embedder = make_pipeline(
+        HashingVectorizer(n_features=2**14, alternate_sign=False),
+        TruncatedSVD(n_components=dim, random_state=42)
+    )
+    embedder.fit(documents)
+    return embedder
+
+
+def build_tiny_summarizer(documents, n_positions=512):
+    """Randomly initialised 2-layer GPT-2 with a word-level tokenizer trained on the corpus."""
+    from tokenizers import Tokenizer, models, pre_tokenizers, trainers
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast, pipeline
+
+    special_tokens = ["[UNK]", "[PAD]", "[EOS]"]
+    word_tokenizer = Tokenizer(models.WordLevel(unk_token="[UNK]"))
+    word_tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    prompt = "Summarize the following text in 4 sentences maximum. ONLY output the summary, " \
+             "do not repeat the original text or include any additional commentary: Summary:"
+    word_tokenizer.train_from_iterator(
+        list(documents) + [prompt], trainers.WordLevelTrainer(special_tokens=special_tokens)
+    )
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=word_tokenizer, unk_token="[UNK]", pad_token="[PAD]", eos_token="[EOS]"
+    )
+    config = GPT2Config(
+        vocab_size=len(tokenizer), n_positions=n_positions, n_embd=64, n_layer=2, n_head=2,
+        eos_token_id=tokenizer.eos_token_id, pad_token_id=tokenizer.pad_token_id
+    )
+    model = GPT2LMHeadModel(config)
+    return pipeline("text-generation", model=model, tokenizer=tokenizer), tokenizer
+
+
+# -----------------------------
+# Stage Drivers
+# -----------------------------
+class _TimedRequests:
+    """Wraps a script's `requests` module to record per-request latency and bytes fetched."""
+
+    def __init__(self, requests_module):
+        self._requests = requests_module
+        self.latencies = []
+        self.bytes = 0
+
+    def get(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        response = self._requests.get(*args, **kwargs)
+        self.latencies.append(time.perf_counter() - t0)
+        self.bytes += len(response.content)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._requests, name)
+
+
+def bench_scale(n_articles, latency, error_rate, summarize_limit, seed):
+    corpus = generate_corpus(n_articles, seed=seed)
+    stages = {}
+
+    with EMMStandIn(corpus, latency=latency, error_rate=error_rate, seed=seed) as server:
+        # 1. NewsBrief pages -> article links
+        news_scraper = load_script("news_scraper_2025.py", "news_scraper_2025")
+        news_scraper.BASE_URL = server.base_url + (
+            "/NewsBrief/dynamic?language=en&edition=categoryarticles&option=FoodSafety&page={page_num}"
+        )
+        news_requests = _TimedRequests(news_scraper.requests)
+        news_scraper.requests = news_requests
+        pages = -(-n_articles // server.articles_per_page)
+        links = []
+        stages["news_scraper"] = run_stage(
+            "news_scraper", [pages + 1],
+            lambda max_pages: links.extend(news_scraper.scrape_all_pages_until_empty(max_pages)) or len(links)
+        )
+        # one call walks all pages; report per page request instead
+        stages["news_scraper"]["latency_ms"] = summarize_latencies(news_requests.latencies)
+        stages["news_scraper"]["bytes_fetched"] = news_requests.bytes
+
+        # 2. RSS windows -> article links with publication dates
+        rssfeeder = load_script("HOLiFOOD_ERI_rssfeeder.py", "HOLiFOOD_ERI_rssfeeder")
+        rssfeeder.RSS_BASE_URL = server.base_url + "/rss/rss"
+        days = sorted({a["date"].date() for a in corpus})
+        rss_urls = [url for day in days for url in rssfeeder.generate_rss_urls(day)]
+        stages["rssfeeder"] = run_stage(
+            "rssfeeder", rss_urls, lambda url: len(rssfeeder.parse_rss_feeds([url]))
+        )
+
+        # 3. Article HTML -> cleaned text
+        article_scraper = load_script("article_scraper_json_2025.py", "article_scraper_json_2025")
+        timed_requests = _TimedRequests(article_scraper.requests)
+        article_scraper.requests = timed_requests
+        urls = [link["URL"] for link in links] or [server.base_url + a["path"] for a in corpus]
+        contents = []
+        stages["article_scraper"] = run_stage(
+            "article_scraper", urls, lambda url: _scrape_article(article_scraper, url, contents)
+        )
+        stages["article_scraper"]["bytes_fetched"] = timed_requests.bytes
+        stages["article_scraper"]["requests_served"] = server.requests_served
+
+    documents = contents or [a["content"] for a in corpus]
+
+    # 4. LLM summarization with a tiny local model
+    summarizer_script = load_script("summarizer_2025 (1).py", "summarizer_2025")
+    pipe, tokenizer = build_tiny_summarizer(documents)
+    stages["summarizer"] = run_stage(
+        "summarizer", documents[:summarize_limit],
+        lambda text: _summarize(summarizer_script, pipe, tokenizer, text)
+    )
+    stages["summarizer"]["tokens_in"] = int(sum(
+        len(tokenizer.encode(text, add_special_tokens=False)) for text in documents[:summarize_limit]
+    ))
+
+    # 5. Embedding and 6. BERTopic fitting (count and online vectorizers)
+    from topic_pipeline import build_topic_model, fit_online
+
+    embedder = build_tiny_embedder(documents)
+    batches = [documents[i:i + 64] for i in range(0, len(documents), 64)]
+    embedded = []
+    stages["embedding"] = run_stage(
+        "embedding", batches, lambda batch: embedded.append(embedder.transform(batch)) or len(batch)
+    )
+    embeddings = np.vstack(embedded)
+
+    for mode in ("count", "online"):
+        topic_model = build_topic_model(embedder, vectorizer_mode=mode, n_clusters=8)
+        topic_model.verbose = False
+        if mode == "online":
+            fit = lambda docs: len(fit_online(topic_model, docs, embeddings, batch_size=500))
+        else:
+            fit = lambda docs: len(topic_model.fit_transform(docs, embeddings)[0])
+        stages[f"bertopic_{mode}"] = run_stage(f"bertopic_{mode}", [documents], fit)
+        stages[f"bertopic_{mode}"]["topics"] = len(topic_model.get_topics())
+
+    # high-water mark of the whole process up to the end of this scale, not a per-scale peak
+    return {"n_articles": n_articles, "stages": stages, "process_max_rss_mb_so_far": max_rss_mb()}
+
+
+def _summarize(summarizer_script, pipe, tokenizer, text):
+    # chunk size and output length scaled down to the tiny model's context
+    summarizer_script.summarize_with_llama(text, pipe, tokenizer, max_tokens=256, max_new_tokens=32)
+    return 1
+
+
+def _scrape_article(article_scraper, url, contents):
+    content, error = article_scraper.scrape_url(url)
+    if error:
+        raise RuntimeError(error)
+    contents.append(content)
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the EMM text mining pipeline.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean stand-in response delay (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 500 responses")
+    parser.add_argument("--summarize-limit", type=int, default=50, help="Articles summarized per scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+    setup_logging()
+
+    results = {
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "config": vars(args),
+        "scales": [
+            bench_scale(n, args.latency, args.error_rate, args.summarize_limit, args.seed)
+            for n in args.scales
+        ]
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    logging.info(f"Benchmark results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+import os
+import re
+import json
+import time
+import argparse
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # fall back to exact search over the normalized embedding matrix
+    hnswlib = None
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9\-]+")
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def tokenize(text):
+    return set(TOKEN_PATTERN.findall(str(text).lower()))
+
+
+def _timestamp(value):
+    """Scrape Date as a POSIX timestamp; missing or unparseable dates sort last (-inf)."""
+    for parse in (lambda v: datetime.strptime(v, DATE_FORMAT), datetime.fromisoformat):
+        try:
+            return parse(str(value)).timestamp()
+        except ValueError:
+            continue
+    return float("-inf")
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# -----------------------------
+# Search Index
+# -----------------------------
+class SearchIndex:
+    """
+    Persistent index over the summarized articles:
+    - approximate nearest neighbours on the stored embeddings (hnswlib, exact numpy search if missing)
+    - inverted keyword index over summary text and topic keywords
+    - topic -> documents index
+    New articles are appended with add() without rebuilding anything.
+    """
+
+    def __init__(self, dim, max_elements=10000, ef=100, M=16):
+        self.dim = dim
+        self.ef = ef
+        self.records = []
+        self.timestamps = []
+        self.embeddings = np.zeros((0, dim), dtype=np.float32)
+        self.keyword_index = defaultdict(set)
+        self.topic_index = defaultdict(set)
+        self.url_index = {}
+        self._centroids = None
+        self.ann = None
+        if hnswlib is not None:
+            self.ann = hnswlib.Index(space="cosine", dim=dim)
+            self.ann.init_index(max_elements=max_elements, ef_construction=200, M=M)
+            self.ann.set_ef(ef)
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, records, embeddings):
+        embeddings = _normalize(embeddings)
+        if len(records) != len(embeddings):
+            raise ValueError(f"Got {len(records)} records but {len(embeddings)} embeddings")
+
+        new_records, new_rows, seen = [], [], set()
+        for record, vector in zip(records, embeddings):
+            url = record.get("URL")
+            if url and (url in self.url_index or url in seen):
+                continue  # already indexed, or repeated within this batch
+            if url:
+                seen.add(url)
+            new_records.append(record)
+            new_rows.append(vector)
+        if not new_records:
+            return 0
+
+        self._centroids = None
+        start = len(self.records)
+        ids = np.arange(start, start + len(new_records))
+        new_rows = np.vstack(new_rows)
+        for doc_id, record in zip(ids, new_records):
+            doc_id = int(doc_id)
+            self.records.append(record)
+            self.timestamps.append(_timestamp(record.get("Scrape Date", "")))
+            if record.get("URL"):
+                self.url_index[record["URL"]] = doc_id
+            self.topic_index[int(record.get("Assigned_Topic", -1))].add(doc_id)
+            text = " ".join([str(record.get("Summary", ""))] + list(record.get("Topic_Keywords") or []))
+            for token in tokenize(text):
+                self.keyword_index[token].add(doc_id)
+
+        self.embeddings = np.vstack([self.embeddings, new_rows])
+        if self.ann is not None:
+            if len(self.records) > self.ann.get_max_elements():
+                self.ann.resize_index(max(len(self.records), 2 * self.ann.get_max_elements()))
+            self.ann.add_items(new_rows, ids)
+        return len(new_records)
+
+    def _candidates(self, topic=None, keywords=None):
+        candidates = None
+        if topic is not None:
+            candidates = set(self.topic_index.get(int(topic), set()))
+        for keyword in keywords or []:
+            # every token of a keyword phrase has to occur in the document
+            for token in tokenize(keyword) or {keyword.lower()}:
+                docs = self.keyword_index.get(token, set())
+                candidates = set(docs) if candidates is None else candidates & docs
+        return candidates
+
+    def similar(self, query_vector, top_k=10, topic=None, keywords=None):
+        """Top-k documents closest to an embedding, optionally restricted to a topic and/or keywords."""
+        query = _normalize(query_vector)
+        candidates = self._candidates(topic, keywords)
+        if candidates is not None:
+            # filtered search: exact scoring over the (small) candidate set
+            if not candidates:
+                return []
+            ids = np.fromiter(candidates, dtype=np.int64)
+            scores = self.embeddings[ids] @ query[0]
+            order = np.argsort(-scores)[:top_k]
+            return [self._hit(ids[i], scores[i]) for i in order]
+
+        if not len(self.records):
+            return []
+        top_k = min(top_k, len(self.records))
+        if self.ann is not None:
+            # hnswlib cannot return more neighbours than its search breadth ef
+            self.ann.set_ef(max(self.ef, top_k))
+            labels, distances = self.ann.knn_query(query, k=top_k)
+            return [self._hit(doc_id, 1.0 - dist) for doc_id, dist in zip(labels[0], distances[0])]
+        scores = self.embeddings @ query[0]
+        order = np.argpartition(-scores, top_k - 1)[:top_k]
+        order = order[np.argsort(-scores[order])]
+        return [self._hit(i, scores[i]) for i in order]
+
+    def similar_to_url(self, url, top_k=10, **filters):
+        """Articles similar to an article that is already indexed."""
+        if url not in self.url_index:
+            raise ValueError(f"{url} is not indexed")
+        doc_id = self.url_index[url]
+        hits = self.similar(self.embeddings[doc_id], top_k=top_k + 1, **filters)
+        return [hit for hit in hits if hit["URL"] != url][:top_k]
+
+    def documents(self, topic=None, keywords=None, limit=50):
+        """All documents of a topic and/or containing the keywords, newest Scrape Date first."""
+        candidates = self._candidates(topic, keywords)
+        if candidates is None:
+            candidates = range(len(self.records))
+        # ties (and undated articles) in reverse insertion order
+        ids = sorted(candidates, key=lambda doc_id: (self.timestamps[doc_id], doc_id), reverse=True)[:limit]
+        return [self._hit(doc_id) for doc_id in ids]
+
+    def topics(self, query_vector, top_k=5):
+        """Topics whose centroid is closest to an embedding (like topic_model.find_topics)."""
+        if self._centroids is None:
+            topic_ids = [t for t in self.topic_index if t != -1]
+            centroids = np.zeros((len(topic_ids), self.dim), dtype=np.float32)
+            for row, t in enumerate(topic_ids):
+                centroids[row] = self.embeddings[sorted(self.topic_index[t])].mean(axis=0)
+            self._centroids = (topic_ids, _normalize(centroids))
+        topic_ids, centroids = self._centroids
+        if not topic_ids:
+            return []
+        scores = centroids @ _normalize(query_vector)[0]
+        order = np.argsort(-scores)[:top_k]
+        return [
+            {"Topic": topic_ids[i], "Score": round(float(scores[i]), 4), "Count": len(self.topic_index[topic_ids[i]])}
+            for i in order
+        ]
+
+    def _hit(self, doc_id, score=None):
+        record = self.records[int(doc_id)]
+        hit = {
+            "URL": record.get("URL", ""),
+            "Topic": record.get("Assigned_Topic", -1),
+            "Scrape Date": record.get("Scrape Date", ""),
+            "Summary": str(record.get("Summary", ""))[:200]
+        }
+        if score is not None:
+            hit["Score"] = round(float(score), 4)
+        return hit
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "embeddings.npy"), self.embeddings)
+        with open(os.path.join(directory, "records.json"), "w", encoding="utf-8") as f:
+            json.dump(self.records, f, ensure_ascii=False)
+        if self.ann is not None:
+            self.ann.save_index(os.path.join(directory, "ann.bin"))
+
+    @classmethod
+    def load(cls, directory):
+        embeddings = np.load(os.path.join(directory, "embeddings.npy"))
+        with open(os.path.join(directory, "records.json"), "r", encoding="utf-8") as f:
+            records = json.load(f)
+        index = cls(embeddings.shape[1], max_elements=max(len(records), 1))
+        ann, index.ann = index.ann, None
+        index.add(records, embeddings)
+        ann_path = os.path.join(directory, "ann.bin")
+        if ann is not None:
+            # a saved graph is only reusable when no records were dropped as duplicates on reload
+            if os.path.exists(ann_path) and len(index) == len(records):
+                # reuse the saved graph, only the keyword/topic maps are rebuilt
+                ann = hnswlib.Index(space="cosine", dim=index.dim)
+                ann.load_index(ann_path, max_elements=max(len(records), 1))
+                ann.set_ef(index.ef)
+            else:
+                ann.add_items(index.embeddings, np.arange(len(index)))
+        index.ann = ann
+        return index
+
+
+def build_index(records, embeddings, directory):
+    index = SearchIndex(np.asarray(embeddings).shape[1], max_elements=max(len(records), 1))
+    index.add(records, embeddings)
+    index.save(directory)
+    return index
+
+
+# -----------------------------
+# Command Line Interface
+# -----------------------------
+def _load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _print_hits(hits, elapsed_time):
+    print(json.dumps(hits, ensure_ascii=False, indent=2))
+    print(f"{len(hits)} results in {elapsed_time * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic search over summarized EMM articles.")
+    parser.add_argument("--index", default="search_index", help="Index directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("build", "add"):
+        p = sub.add_parser(name, help=f"{name} articles from a topics JSON and an embeddings .npy")
+        p.add_argument("records", help="e.g. input_with_topics.json")
+        p.add_argument("embeddings", help="e.g. embeddings.npy")
+
+    p = sub.add_parser("query", help="Articles and topics similar to a free-text query")
+    p.add_argument("text")
+    p.add_argument("--top-k", type=int, default=10)
+    p.add_argument("--topic", type=int)
+    p.add_argument("--keyword", action="append")
+    p.add_argument("--model", default="intfloat/multilingual-e5-large-instruct")
+
+    p = sub.add_parser("similar", help="Articles similar to an indexed article URL")
+    p.add_argument("url")
+    p.add_argument("--top-k", type=int, default=10)
+
+    p = sub.add_parser("topic", help="Documents of a topic, optionally containing keywords")
+    p.add_argument("topic", type=int)
+    p.add_argument("--keyword", action="append")
+    p.add_argument("--limit", type=int, default=50)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index = build_index(_load_json(args.records), np.load(args.embeddings), args.index)
+        print(f"Indexed {len(index)} articles into {args.index}")
+        return
+
+    index = SearchIndex.load(args.index)
+    if args.command == "add":
+        added = index.add(_load_json(args.records), np.load(args.embeddings))
+        index.save(args.index)
+        print(f"Added {added} new articles ({len(index)} total) to {args.index}")
+    elif args.command == "query":
+        from sentence_transformers import SentenceTransformer
+        query_vector = SentenceTransformer(args.model).encode([args.text])[0]
+        start_time = time.time()
+        hits = index.similar(query_vector, top_k=args.top_k, topic=args.topic, keywords=args.keyword)
+        topics = index.topics(query_vector)
+        elapsed_time = time.time() - start_time
+        print(json.dumps({"topics": topics}, indent=2))
+        _print_hits(hits, elapsed_time)
+    elif args.command == "similar":
+        start_time = time.time()
+        try:
+            hits = index.similar_to_url(args.url, top_k=args.top_k)
+        except ValueError as e:
+            parser.error(str(e))
+        _print_hits(hits, time.time() - start_time)
+    elif args.command == "topic":
+        start_time = time.time()
+        hits = index.documents(topic=args.topic, keywords=args.keyword, limit=args.limit)
+        _print_hits(hits, time.time() - start_time)
+
+
+if __name__ == "__main__":
+    main()
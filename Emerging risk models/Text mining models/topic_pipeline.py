@@ -0,0 +1,214 @@
+import json
+import time
+import tracemalloc
+
+import numpy as np
+from umap import UMAP
+from hdbscan import HDBSCAN
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import IncrementalPCA
+from sklearn.feature_extraction.text import CountVectorizer
+from bertopic import BERTopic
+from bertopic.representation import KeyBERTInspired
+from bertopic.vectorizers import OnlineCountVectorizer
+
+# -----------------------------
+# Vectorizer Setup
+# -----------------------------
+# "count"  : the original CountVectorizer, vocabulary rebuilt over the whole corpus each run
+# "online" : OnlineCountVectorizer, vocabulary grows batch by batch, old counts decay and
+#            rare n-grams are pruned, so memory stays bounded as new articles arrive
+VECTORIZER_MODES = ("count", "online")
+
+
+def build_vectorizer(mode="count", decay=0.01, delete_min_df=2, min_df=2, ngram_range=(1, 2)):
+    if mode == "count":
+        return CountVectorizer(stop_words="english", min_df=min_df, ngram_range=ngram_range)
+    if mode == "online":
+        # min_df is not supported for online updates; delete_min_df takes its place
+        return OnlineCountVectorizer(
+            stop_words="english",
+            ngram_range=ngram_range,
+            decay=decay,
+            delete_min_df=delete_min_df
+        )
+    raise ValueError(f"Unknown vectorizer mode: {mode} (expected one of {VECTORIZER_MODES})")
+
+
+# -----------------------------
+# Topic Model Setup
+# -----------------------------
+# "umap_hdbscan" : the original UMAP + HDBSCAN clustering, fitted on the whole corpus
+# "incremental"  : IncrementalPCA + MiniBatchKMeans, which support partial_fit (needed by "online")
+CLUSTERING_MODES = ("umap_hdbscan", "incremental")
+
+
+def build_topic_model(embedding_model, vectorizer_mode="count", n_clusters=50, clustering=None,
+                      **vectorizer_kwargs):
+    """
+    Build the BERTopic pipeline used by the topic scripts.
+    In "online" mode UMAP/HDBSCAN are swapped for IncrementalPCA/MiniBatchKMeans,
+    which support partial_fit, so topics can be updated one batch at a time.
+    clustering overrides that choice, e.g. to fit the count vectorizer with the incremental clustering.
+    """
+    clustering = clustering or ("incremental" if vectorizer_mode == "online" else "umap_hdbscan")
+    if clustering not in CLUSTERING_MODES:
+        raise ValueError(f"Unknown clustering mode: {clustering} (expected one of {CLUSTERING_MODES})")
+    vectorizer_model = build_vectorizer(vectorizer_mode, **vectorizer_kwargs)
+    representation_model = {"KeyBERT": KeyBERTInspired()}
+
+    if clustering == "incremental":
+        umap_model = IncrementalPCA(n_components=5)
+        hdbscan_model = MiniBatchKMeans(n_clusters=n_clusters, random_state=42)
+    else:
+        umap_model = UMAP(
+            n_neighbors=15,
+            n_components=5,
+            min_dist=0.0,
+            metric="cosine",
+            random_state=42
+        )
+        hdbscan_model = HDBSCAN(
+            min_cluster_size=3,
+            metric="euclidean",
+            cluster_selection_method="eom",
+            prediction_data=True
+        )
+
+    return BERTopic(
+        embedding_model=embedding_model,
+        umap_model=umap_model,
+        hdbscan_model=hdbscan_model,
+        vectorizer_model=vectorizer_model,
+        representation_model=representation_model,
+        top_n_words=10,
+        verbose=True
+    )
+
+
+def iter_batches(documents, embeddings, batch_size, min_size=1):
+    """Yield (documents, embeddings) batches; a trailing batch below min_size is folded into the previous one."""
+    bounds = list(range(0, len(documents), batch_size)) + [len(documents)]
+    if len(bounds) > 2 and bounds[-1] - bounds[-2] < min_size:
+        del bounds[-2]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        yield documents[start:end], embeddings[start:end]
+
+
+def fit_online(topic_model, documents, embeddings, batch_size=1000):
+    """
+    Update an online topic model batch by batch and return the topic of every document.
+    The same call can be repeated later with only the newly scraped articles.
+    """
+    # IncrementalPCA needs at least n_components samples per batch, MiniBatchKMeans n_clusters
+    min_size = max(topic_model.umap_model.n_components, getattr(topic_model.hdbscan_model, "n_clusters", 1))
+    if len(documents) < min_size:
+        raise ValueError(f"At least {min_size} documents are needed to update the online topic model")
+    topics = []
+    for batch_docs, batch_embeddings in iter_batches(documents, embeddings, max(batch_size, min_size), min_size):
+        topic_model.partial_fit(batch_docs, batch_embeddings)
+        topics.extend(topic_model.topics_)
+    # partial_fit leaves only the last batch in topics_; topics_over_time and friends need all documents
+    topic_model.topics_ = topics
+    return topics
+
+
+# -----------------------------
+# Comparison against the current representations
+# -----------------------------
+def topic_keywords(topic_model, top_n=10):
+    return {
+        topic: [word for word, _ in topic_model.get_topic(topic)[:top_n]]
+        for topic in topic_model.get_topics()
+        if topic != -1
+    }
+
+
+def keyword_overlap(reference, candidate):
+    """
+    For every reference topic take the best Jaccard overlap with any candidate topic,
+    then average. 1.0 means every reference topic is reproduced exactly.
+    """
+    if not reference or not candidate:
+        return 0.0
+    candidate_sets = [set(words) for words in candidate.values()]
+    scores = []
+    for words in reference.values():
+        ref = set(words)
+        scores.append(max(len(ref & cand) / len(ref | cand) for cand in candidate_sets))
+    return float(np.mean(scores))
+
+
+def _measure(fn):
+    tracemalloc.start()
+    start_time = time.time()
+    result = fn()
+    elapsed_time = time.time() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed_time, peak
+
+
+def compare_vectorizers(documents, embeddings, embedding_model, batch_size=1000, top_n=10):
+    """
+    Fit three models on the same documents and report keyword agreement, wall time and peak
+    Python memory:
+      "count"             the current pipeline (CountVectorizer, UMAP + HDBSCAN)
+      "count_incremental" CountVectorizer with the online clustering (IncrementalPCA + MiniBatchKMeans)
+      "online"            OnlineCountVectorizer with the online clustering, fitted batch by batch
+    The online model changes both the vectorizer and the clustering, so the overlap is reported
+    per change: count_incremental vs. online isolates the vectorizer (clustering held fixed),
+    count vs. count_incremental isolates the clustering.
+    """
+    count_model = build_topic_model(embedding_model, "count")
+    _, count_time, count_peak = _measure(lambda: count_model.fit_transform(documents, embeddings))
+
+    incremental_model = build_topic_model(embedding_model, "count", clustering="incremental")
+    _, incremental_time, incremental_peak = _measure(lambda: incremental_model.fit_transform(documents, embeddings))
+
+    online_model = build_topic_model(embedding_model, "online")
+    _, online_time, online_peak = _measure(
+        lambda: fit_online(online_model, documents, embeddings, batch_size=batch_size)
+    )
+
+    def summary(model, keywords, elapsed_time, peak):
+        return {
+            "topics": len(keywords),
+            "vocabulary": len(model.vectorizer_model.vocabulary_),
+            "seconds": round(elapsed_time, 2),
+            "peak_memory_mb": round(peak / 2**20, 1)
+        }
+
+    count_keywords = topic_keywords(count_model, top_n)
+    incremental_keywords = topic_keywords(incremental_model, top_n)
+    online_keywords = topic_keywords(online_model, top_n)
+    return {
+        "documents": len(documents),
+        "batch_size": batch_size,
+        "count": summary(count_model, count_keywords, count_time, count_peak),
+        "count_incremental": summary(incremental_model, incremental_keywords, incremental_time, incremental_peak),
+        "online": summary(online_model, online_keywords, online_time, online_peak),
+        "keyword_overlap": {
+            "vectorizer_only": round(keyword_overlap(incremental_keywords, online_keywords), 3),
+            "clustering_only": round(keyword_overlap(count_keywords, incremental_keywords), 3),
+            "count_vs_online": round(keyword_overlap(count_keywords, online_keywords), 3)
+        }
+    }
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from sentence_transformers import SentenceTransformer
+
+    input_json = "data.json"
+    with open(input_json, "r", encoding="utf-8") as f:
+        df = pd.DataFrame(json.load(f))
+    documents = df["Summary"].to_list()
+
+    embedding_model = SentenceTransformer("intfloat/multilingual-e5-large-instruct")
+    embeddings = embedding_model.encode(documents, show_progress_bar=True)
+
+    report = compare_vectorizers(documents, embeddings, embedding_model)
+    print(json.dumps(report, indent=2))
+    with open("vectorizer_comparison.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)